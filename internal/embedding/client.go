@@ -2,9 +2,11 @@ package embedding
 
 import (
 	"bytes"
+	"encoding/binary"
 	"encoding/json"
 	"fmt"
 	"net/http"
+	"strconv"
 	"time"
 )
 
@@ -37,7 +39,8 @@ type EmbedResponse struct {
 
 // EmbedBatchRequest represents a request to embed multiple texts
 type EmbedBatchRequest struct {
-	Texts []string `json:"texts"`
+	Texts          []string `json:"texts"`
+	ResponseFormat string   `json:"response_format,omitempty"`
 }
 
 // EmbedBatchResponse represents the response from embedding multiple texts
@@ -79,7 +82,7 @@ func (c *Client) Embed(text string) ([]float32, error) {
 
 // EmbedBatch generates embeddings for multiple texts (more efficient than calling Embed multiple times)
 func (c *Client) EmbedBatch(texts []string) ([][]float32, error) {
-	reqBody := EmbedBatchRequest{Texts: texts}
+	reqBody := EmbedBatchRequest{Texts: texts, ResponseFormat: "binary"}
 	jsonData, err := json.Marshal(reqBody)
 	if err != nil {
 		return nil, fmt.Errorf("failed to marshal request: %w", err)
@@ -99,10 +102,24 @@ func (c *Client) EmbedBatch(texts []string) ([][]float32, error) {
 		return nil, fmt.Errorf("embedding service returned status %d", resp.StatusCode)
 	}
 
-	var result EmbedBatchResponse
-	if err := json.NewDecoder(resp.Body).Decode(&result); err != nil {
+	// Binary response: count x dim little-endian float32 values
+	count, err := strconv.Atoi(resp.Header.Get("X-Count"))
+	if err != nil {
+		return nil, fmt.Errorf("invalid X-Count header: %w", err)
+	}
+	dim, err := strconv.Atoi(resp.Header.Get("X-Dim"))
+	if err != nil {
+		return nil, fmt.Errorf("invalid X-Dim header: %w", err)
+	}
+
+	flat := make([]float32, count*dim)
+	if err := binary.Read(resp.Body, binary.LittleEndian, flat); err != nil {
 		return nil, fmt.Errorf("failed to decode response: %w", err)
 	}
 
-	return result.Embeddings, nil
+	embeddings := make([][]float32, count)
+	for i := range embeddings {
+		embeddings[i] = flat[i*dim : (i+1)*dim : (i+1)*dim]
+	}
+	return embeddings, nil
 }
@@ -299,7 +299,7 @@ func (rm *RoomManager) processSharedRoomAudio(meetingID string, participantID in
 // transcribeAudio sends audio to ASR service and returns transcription + detected language
 func transcribeAudio(wavData []byte) (string, string, error) {
 	// Send WAV data directly (not multipart) - same pattern as asr.Client
-	url := fmt.Sprintf("%s/detect-language", asrBaseURL)
+	url := fmt.Sprintf("%s/detect-language?include_text=true", asrBaseURL)
 	req, err := http.NewRequest("POST", url, bytes.NewReader(wavData))
 	if err != nil {
 		return "", "", err
@@ -0,0 +1,84 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Smoke test for the ASR service's non-streaming endpoints used by the Go backend
+# (internal/asr/client.go and internal/meeting/websocket.go)
+
+ASR_URL=${ASR_URL:-http://localhost:8003}
+
+pass_count=0
+fail_count=0
+
+tmp_wav=$(mktemp --suffix=.wav)
+trap 'rm -f "${tmp_wav}"' EXIT
+
+# 2 seconds of a 440 Hz tone, 16 kHz mono PCM16
+python3 - "${tmp_wav}" <<'EOF'
+import math, struct, sys, wave
+sr = 16000
+with wave.open(sys.argv[1], "wb") as w:
+    w.setnchannels(1)
+    w.setsampwidth(2)
+    w.setframerate(sr)
+    w.writeframes(b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / sr)))
+        for i in range(sr * 2)
+    ))
+EOF
+
+test_case() {
+  local name=$1
+  local path=$2
+  local expected_keys=$3
+  local language=${4:-}
+
+  local headers=(-H "Content-Type: audio/wav")
+  if [[ -n "${language}" ]]; then
+    headers+=(-H "X-Language: ${language}")
+  fi
+
+  local resp
+  resp=$(curl -s -w "\n%{http_code}" -X POST "${headers[@]}" \
+    --data-binary "@${tmp_wav}" "${ASR_URL}${path}")
+
+  local body=${resp%$'\n'*}
+  local status=${resp##*$'\n'}
+
+  if printf "%s" "$body" | python3 -c 'import json,sys
+status = int(sys.argv[1])
+expected_keys = sys.argv[2].split(",")
+if status != 200:
+    print(f"status {status} != 200")
+    raise SystemExit(2)
+try:
+    payload = json.loads(sys.stdin.read())
+except json.JSONDecodeError as exc:
+    print(f"invalid json: {exc}")
+    raise SystemExit(3)
+missing = [key for key in expected_keys if key not in payload]
+if missing:
+    print(f"missing keys: {missing}")
+    raise SystemExit(4)
+' "$status" "$expected_keys"
+  then
+    echo "PASS: ${name}"
+    pass_count=$((pass_count + 1))
+  else
+    echo "FAIL: ${name}"
+    echo "  status=${status}"
+    echo "  body=${body}"
+    fail_count=$((fail_count + 1))
+  fi
+}
+
+test_case "transcribe" "/transcribe" "text,language"
+test_case "transcribe with language" "/transcribe" "text,language" "en"
+test_case "detect language" "/detect-language" "language,probability"
+test_case "detect language with text" "/detect-language?include_text=true" "language,text"
+
+if [[ ${fail_count} -gt 0 ]]; then
+  echo "${fail_count} test(s) failed"
+  exit 1
+fi
+
+echo "All ${pass_count} test(s) passed"
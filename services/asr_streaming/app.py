@@ -1,24 +1,34 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import torch
+import torchaudio
 import numpy as np
-from faster_whisper import WhisperModel
-import whisper  # OpenAI Whisper for actual transcription
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.vad import get_vad_model
 import asyncio
+import functools
+import heapq
 import json
+import logging
+import logging.handlers
+import queue
+import orjson
 import os
-from collections import deque
+import re
 import time
 from datetime import datetime, timezone
 from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 from pyannote.audio import Pipeline, Inference
 import io
-import wave
+import soundfile as sf
 import requests
 
-app = FastAPI()
+from log_mel import IncrementalLogMel
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,21 +38,55 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load OpenAI Whisper model (simpler, no generator issues)
-MODEL_SIZE = "medium"  # Medium model - best balance for 8GB GPU
+# Per-tick diagnostics go through logging at DEBUG; a QueueHandler keeps the
+# stdout write off the event loop thread
+logger = logging.getLogger("asr")
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+logger.propagate = False
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+
+# pyannote's CPU ops share the host with CTranslate2's own cpu_threads pool
+torch.set_num_threads(int(os.getenv("TORCH_THREADS", "4")))
+torch.set_num_interop_threads(1)
+
+# Load faster-whisper (CTranslate2) model
+# large-v3-turbo: large-v3 encoder with a 4-layer decoder, faster than medium and
+# more accurate; set ASR_MODEL=distil-large-v3 for English-only deployments
+MODEL_SIZE = os.getenv("ASR_MODEL", "large-v3-turbo")
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# int8 weights with fp16 activations on GPU halve weight memory vs float16;
+# plain int8 on CPU is ~2x faster than float32 with equivalent accuracy
+COMPUTE_TYPE = "int8_float16" if DEVICE == "cuda" else "int8"
+
+ASR_NUM_WORKERS = int(os.getenv("ASR_NUM_WORKERS", "2"))
+
+print(f"Loading faster-whisper model: {MODEL_SIZE} on {DEVICE} ({COMPUTE_TYPE})")
+model = WhisperModel(
+    MODEL_SIZE,
+    device=DEVICE,
+    compute_type=COMPUTE_TYPE,
+    cpu_threads=os.cpu_count() or 0,
+    # Multiple CTranslate2 workers let concurrent transcribe() calls from the
+    # executor run in parallel instead of queueing on a single model replica
+    num_workers=ASR_NUM_WORKERS
+)
+# Batched pipeline over the same weights: VAD-chunks long audio and encodes/decodes chunks together
+batched_model = BatchedInferencePipeline(model=model)
+BATCH_SIZE = int(os.getenv("ASR_BATCH_SIZE", "8"))
+print("faster-whisper model loaded successfully")
 
-print(f"Loading OpenAI Whisper model: {MODEL_SIZE} on {DEVICE}")
-whisper_model = whisper.load_model(MODEL_SIZE, device=DEVICE)
-print(f"OpenAI Whisper model loaded successfully")
-
-# Load Silero VAD
+# Load Silero VAD (v5 ONNX export on CPU; each session carries its own recurrent state)
 print("Loading Silero VAD...")
 vad_model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
                                    model='silero_vad',
-                                   force_reload=False)
+                                   force_reload=False,
+                                   onnx=True)
 (get_speech_timestamps, _, read_audio, _, _) = utils
-print("VAD loaded successfully")
+vad_session = vad_model.session
+print("VAD loaded successfully (ONNX Runtime, CPU)")
 
 # Load speaker diarization pipeline
 print("Loading speaker diarization pipeline...")
@@ -99,12 +143,31 @@ SAMPLE_RATE = 16000
 CHUNK_DURATION = 1.0  # Process 1 second at a time for streaming
 CHUNK_SIZE = int(SAMPLE_RATE * CHUNK_DURATION)
 VAD_THRESHOLD = 0.3  # Voice activity detection threshold (lowered for better sensitivity)
+VAD_WINDOW_SIZE = 512  # Silero VAD window for 16kHz audio
+VAD_MAX_WINDOWS = 8  # Max windows scored per VAD call (~256ms)
+VAD_HOP_SAMPLES = VAD_WINDOW_SIZE * 3  # New audio needed to wake the processing loop (~96ms)
+VAD_ENERGY_FLOOR = float(os.getenv("VAD_ENERGY_FLOOR", "1e-4"))  # Mean-square level below which VAD is skipped (-40 dBFS)
+VAD_CONTEXT_SIZE = 64  # Silero v5 prepends the previous window's last 64 samples
+VAD_SR = np.array(SAMPLE_RATE, dtype=np.int64)
 SILENCE_DURATION = 1.2  # Seconds of silence to finalize segment
 MAX_SEGMENT_DURATION = 10.0  # Max seconds before forcing finalization (new!)
+AUDIO_BUFFER_SAMPLES = SAMPLE_RATE * 30  # Rolling buffer of the most recent 30 seconds
+PCM16_SCALE = np.float32(1.0 / 32768.0)
+# Raw upload framing: 8-byte magic + uint32 LE sample rate, then mono float32 LE samples
+RAW_F32_MAGIC = b"RAWF32\0\0"
+RAW_F32_HEADER_SIZE = len(RAW_F32_MAGIC) + 4
+NO_SPEECH_THRESHOLD = 0.6  # Drop partials the decoder flags as silence (faster-whisper default)
+HALLUCINATION_RE = re.compile(r"\b(thank you|thanks for watching|subscribe)\b", re.IGNORECASE)
+PROMPT_CONTEXT_TOKENS = 64  # Max previous-segment tokens prompted into a streaming partial
+PROMPT_CONTEXT_CHARS = 200  # Previous-segment text kept for that prompt
+STREAM_BATCH_MAX = int(os.getenv("STREAM_BATCH_MAX", "8"))  # Max streaming windows decoded together
+STREAM_BATCH_WAIT = float(os.getenv("STREAM_BATCH_WAIT_MS", "50")) / 1000.0  # How long to collect a batch
 
 # Speaker tracking configuration
 SPEAKER_SIM_THRESHOLD = float(os.getenv("SPEAKER_SIM_THRESHOLD", "0.82"))
 MIN_EMBED_DURATION = float(os.getenv("MIN_EMBED_DURATION", "0.8"))
+SPEAKER_REF_SEGMENTS = int(os.getenv("SPEAKER_REF_SEGMENTS", "3"))  # Top-k segments embedded per chunk speaker
+SPEAKER_REF_RECENCY_ALPHA = float(os.getenv("SPEAKER_REF_RECENCY_ALPHA", "1.0"))
 SPEAKER_OVERLAP_RATIO_THRESHOLD = float(os.getenv("SPEAKER_OVERLAP_RATIO_THRESHOLD", "0.25"))
 SPEAKER_CONFIDENCE_THRESHOLD = float(os.getenv("SPEAKER_CONFIDENCE_THRESHOLD", "0.55"))
 SPEAKER_PROFILE_TTL_SECONDS = int(os.getenv("SPEAKER_PROFILE_TTL_SECONDS", "3600"))
@@ -115,23 +178,91 @@ SPEAKER_PROFILE_PERSIST_INTERVAL_SECONDS = int(os.getenv("SPEAKER_PROFILE_PERSIS
 # Thread pool for CPU-bound operations
 executor = ThreadPoolExecutor(max_workers=4)
 
+# One slot per CTranslate2 worker: extra concurrent calls wait here on the event loop
+# instead of blocking executor threads inside CTranslate2's own queue, which would
+# starve feature extraction and other CPU work sharing the pool
+model_slots = asyncio.Semaphore(ASR_NUM_WORKERS)
+
+async def run_model(func, *args, **kwargs):
+    """Run a blocking model call on the executor while holding a model slot"""
+    async with model_slots:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(func, *args, **kwargs)
+        )
+
 # Session storage for final high-quality transcriptions
 session_transcriptions: Dict[str, dict] = {}
 session_speaker_profiles: Dict[str, dict] = {}
 last_profile_cleanup_ts = 0.0
 
-def audio_array_to_wav_bytes(audio_array: np.ndarray, sample_rate: int = 16000) -> bytes:
-    """Convert numpy audio array to WAV bytes for diarization pipeline"""
-    wav_buffer = io.BytesIO()
-    with wave.open(wav_buffer, 'wb') as wav_file:
-        wav_file.setnchannels(1)  # Mono
-        wav_file.setsampwidth(2)  # 16-bit
-        wav_file.setframerate(sample_rate)
-        # Convert float32 to int16
-        audio_int16 = (audio_array * 32767).astype(np.int16)
-        wav_file.writeframes(audio_int16.tobytes())
-    wav_buffer.seek(0)
-    return wav_buffer.read()
+def pcm16_to_float32(pcm: bytes, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Convert 16-bit PCM bytes to float32 in [-1, 1) with a single fused multiply.
+
+    If ``out`` is large enough the result is written into its head and a view
+    is returned, so callers can reuse one staging buffer across messages.
+    """
+    raw = np.frombuffer(pcm, dtype=np.int16)
+    if out is None or out.shape[0] < raw.shape[0]:
+        out = np.empty(raw.shape, dtype=np.float32)
+    audio = out[:raw.shape[0]]
+    np.multiply(raw, PCM16_SCALE, out=audio, casting="unsafe")
+    return audio
+
+def rms(audio: np.ndarray) -> float:
+    """Root-mean-square level via a single BLAS dot product (no squared temporary)"""
+    if audio.size == 0:
+        return 0.0
+    return float(np.sqrt(np.dot(audio, audio) / audio.size))
+
+def wav_bytes_to_float32_mono(audio_data: bytes) -> np.ndarray:
+    """Decode WAV bytes to a mono float32 array at SAMPLE_RATE"""
+    # libsndfile decodes and scales straight into a float32 buffer in one pass
+    audio, sr = sf.read(io.BytesIO(audio_data), dtype="float32", always_2d=False)
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1, dtype=np.float32)
+    if sr != SAMPLE_RATE:
+        audio = torchaudio.functional.resample(torch.from_numpy(audio), sr, SAMPLE_RATE).numpy()
+    return audio
+
+def decode_audio_body(audio_data: bytes, content_type: str) -> np.ndarray:
+    """Decode a request body: framed raw float32 (application/octet-stream) or WAV"""
+    if content_type.startswith("application/octet-stream") and audio_data.startswith(RAW_F32_MAGIC):
+        if len(audio_data) < RAW_F32_HEADER_SIZE:
+            raise HTTPException(status_code=400, detail="Raw float32 body is shorter than its header")
+        sr = int.from_bytes(audio_data[len(RAW_F32_MAGIC):RAW_F32_HEADER_SIZE], "little")
+        if sr == 0:
+            raise HTTPException(status_code=400, detail="Raw float32 header has a zero sample rate")
+        if (len(audio_data) - RAW_F32_HEADER_SIZE) % 4:
+            raise HTTPException(status_code=400, detail="Raw float32 body length is not a multiple of 4 bytes")
+        # One copy out of the immutable request body (no rescale), so the array is
+        # writable for torch.from_numpy in diarization and speaker embedding
+        audio = np.frombuffer(audio_data, dtype="<f4", offset=RAW_F32_HEADER_SIZE).copy()
+        if sr != SAMPLE_RATE:
+            audio = torchaudio.functional.resample(torch.from_numpy(audio), sr, SAMPLE_RATE).numpy()
+        return audio
+    return wav_bytes_to_float32_mono(audio_data)
+
+def transcribe_text(audio: np.ndarray, **options) -> tuple:
+    """Run model.transcribe and consume its segment generator in the calling (worker) thread, returns (text, language)"""
+    segments, info = model.transcribe(audio, **options)
+    # Segment texts carry their own leading space
+    return "".join(seg.text for seg in segments).strip(), info.language
+
+def transcribe_batched(audio: np.ndarray, language: Optional[str] = None, beam_size: int = 1):
+    """Transcribe long audio with the batched pipeline, returning segment dicts and the detected language"""
+    segments, info = batched_model.transcribe(
+        audio,
+        language=language,
+        batch_size=BATCH_SIZE,
+        beam_size=beam_size,
+        temperature=0.0,
+        compression_ratio_threshold=2.4,
+        word_timestamps=True
+    )
+    return [
+        {"text": seg.text, "start": seg.start, "end": seg.end}
+        for seg in segments
+    ], info.language
 
 def perform_speaker_diarization(
     audio_array: np.ndarray,
@@ -148,17 +279,20 @@ def perform_speaker_diarization(
     try:
         print("🎭 Starting speaker diarization...")
 
-        # Convert audio to WAV format in memory
-        wav_bytes = audio_array_to_wav_bytes(audio_array, SAMPLE_RATE)
-        wav_io = io.BytesIO(wav_bytes)
+        # Hand pyannote the in-memory waveform (channel, time) instead of a WAV roundtrip
+        waveform = torch.from_numpy(audio_array).unsqueeze(0)
 
         # Run diarization
-        diarization_kwargs = {"uri": "stream", "audio": wav_io}
+        diarization_kwargs = {}
         if min_speakers is not None:
             diarization_kwargs["min_speakers"] = min_speakers
         if max_speakers is not None:
             diarization_kwargs["max_speakers"] = max_speakers
-        diarization = diarization_pipeline(diarization_kwargs)
+        with torch.inference_mode():
+            diarization = diarization_pipeline(
+                {"waveform": waveform, "sample_rate": SAMPLE_RATE, "uri": "stream"},
+                **diarization_kwargs
+            )
 
         # Extract speaker segments (filter out very short segments)
         strictness_value = None
@@ -200,11 +334,17 @@ def perform_speaker_diarization(
         traceback.print_exc()
         return []
 
-def _cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
-    denom = (np.linalg.norm(a) * np.linalg.norm(b))
-    if denom == 0:
-        return 0.0
-    return float(np.dot(a, b) / denom)
+def _vector_norm(a: np.ndarray) -> float:
+    return float(np.sqrt(np.vdot(a, a)))
+
+def _profile_similarities(state: dict, emb: np.ndarray, emb_norm: float) -> np.ndarray:
+    """Cosine similarity of emb against every stored profile in one GEMV"""
+    matrix = state.get("matrix")
+    if matrix is None or matrix.shape[0] == 0:
+        return np.empty(0, dtype=np.float32)
+    denom = state["norms"] * emb_norm
+    dots = matrix @ emb
+    return np.divide(dots, denom, out=np.zeros_like(dots), where=denom != 0)
 
 def _parse_rfc3339(value: str) -> Optional[datetime]:
     if not value:
@@ -239,6 +379,7 @@ def _load_profiles_from_store(session_id: str) -> Optional[dict]:
 
     now = time.time()
     loaded_profiles = []
+    loaded_embeddings = []
     max_index = -1
     for profile in profiles:
         profile_id = profile.get("profileId")
@@ -250,12 +391,11 @@ def _load_profiles_from_store(session_id: str) -> Optional[dict]:
                 continue
         if not profile_id or not embedding:
             continue
-        emb_array = np.array(embedding, dtype=np.float32)
         loaded_profiles.append({
             "id": profile_id,
-            "embedding": emb_array,
             "count": max(1, count),
         })
+        loaded_embeddings.append(np.array(embedding, dtype=np.float32))
         idx = _extract_speaker_index(profile_id)
         if idx is not None:
             max_index = max(max_index, idx)
@@ -263,9 +403,12 @@ def _load_profiles_from_store(session_id: str) -> Optional[dict]:
     if not loaded_profiles:
         return None
 
+    matrix = np.stack(loaded_embeddings)
     return {
         "next_id": max_index + 1,
         "profiles": loaded_profiles,
+        "matrix": matrix,
+        "norms": np.sqrt(np.einsum("ij,ij->i", matrix, matrix)),
         "last_seen": now,
         "last_persist": now,
     }
@@ -274,15 +417,18 @@ def _persist_profiles_to_store(session_id: str, state: dict) -> None:
     if not SPEAKER_PROFILE_STORE_URL:
         return
     profiles = state.get("profiles") or []
+    matrix = state.get("matrix")
+    if matrix is None:
+        return
     payload = {
         "profiles": [
             {
                 "profileId": profile.get("id"),
-                "embedding": profile.get("embedding").astype(float).tolist(),
+                "embedding": embedding.astype(float).tolist(),
                 "count": profile.get("count", 1),
             }
-            for profile in profiles
-            if profile.get("id") and profile.get("embedding") is not None
+            for profile, embedding in zip(profiles, matrix)
+            if profile.get("id")
         ]
     }
     try:
@@ -324,7 +470,8 @@ def _get_session_state(session_id: str) -> dict:
     if state is None:
         state = _load_profiles_from_store(session_id)
         if state is None:
-            state = {"next_id": 0, "profiles": [], "last_seen": now, "last_persist": 0.0}
+            # "matrix" rows are profile embeddings in "profiles" order; "norms" caches their L2 norms
+            state = {"next_id": 0, "profiles": [], "matrix": None, "norms": None, "last_seen": now, "last_persist": 0.0}
         session_speaker_profiles[session_id] = state
     else:
         state["last_seen"] = now
@@ -341,58 +488,84 @@ def _compute_embedding(audio_array: np.ndarray, start: float, end: float) -> Opt
     if len(segment) < int(MIN_EMBED_DURATION * SAMPLE_RATE):
         return None
     waveform = torch.from_numpy(segment).float().unsqueeze(0)
-    emb = embedding_inference({"waveform": waveform, "sample_rate": SAMPLE_RATE})
+    with torch.inference_mode():
+        emb = embedding_inference({"waveform": waveform, "sample_rate": SAMPLE_RATE})
     if isinstance(emb, torch.Tensor):
         emb = emb.detach().cpu().numpy()
     return np.squeeze(emb)
 
+def _select_reference_segments(speaker_segments: list) -> Dict[str, list]:
+    """Pick the top-k segments per chunk speaker by duration x recency.
+
+    Segment i of n scores ``duration * (1 + alpha * i / n)``, so long turns near
+    the end of the chunk are preferred; only these are embedded.
+    """
+    n = len(speaker_segments)
+    by_label: Dict[str, list] = {}
+    for i, seg in enumerate(speaker_segments):
+        duration = seg["end"] - seg["start"]
+        if duration < MIN_EMBED_DURATION:
+            continue
+        phi = duration * (1.0 + SPEAKER_REF_RECENCY_ALPHA * i / n)
+        by_label.setdefault(seg.get("speaker", "SPEAKER_00"), []).append((phi, i))
+    return {
+        label: [speaker_segments[i] for _, i in heapq.nlargest(SPEAKER_REF_SEGMENTS, scored)]
+        for label, scored in by_label.items()
+    }
+
 def assign_persistent_speakers(speaker_segments: list, audio_array: np.ndarray, session_id: Optional[str]) -> list:
     if not session_id or not speaker_segments or not EMBEDDING_ENABLED:
         return speaker_segments
 
     state = _get_session_state(session_id)
-    label_cache: Dict[str, str] = {}
+    label_map: Dict[str, str] = {}
     state_changed = False
 
-    for seg in speaker_segments:
-        label = seg.get("speaker", "SPEAKER_00")
-        if label in label_cache:
-            seg["speaker"] = label_cache[label]
-            continue
-
-        emb = _compute_embedding(audio_array, seg["start"], seg["end"])
-        if emb is None:
+    for label, refs in _select_reference_segments(speaker_segments).items():
+        embeddings = [
+            emb for emb in (_compute_embedding(audio_array, seg["start"], seg["end"]) for seg in refs)
+            if emb is not None
+        ]
+        if not embeddings:
             continue
-
-        best_id = None
-        best_sim = -1.0
-        for profile in state["profiles"]:
-            sim = _cosine_similarity(emb, profile["embedding"])
-            if sim > best_sim:
-                best_sim = sim
-                best_id = profile["id"]
-
-        if best_id is not None and best_sim >= SPEAKER_SIM_THRESHOLD:
-            for profile in state["profiles"]:
-                if profile["id"] == best_id:
-                    count = profile["count"]
-                    profile["embedding"] = (profile["embedding"] * count + emb) / (count + 1)
-                    profile["count"] = count + 1
-                    state_changed = True
-                    break
-            seg["speaker"] = best_id
-            label_cache[label] = best_id
+        emb = np.mean(np.stack(embeddings), axis=0, dtype=np.float32)
+
+        # Score every profile at once against the stacked embedding matrix
+        emb_norm = _vector_norm(emb)
+        sims = _profile_similarities(state, emb, emb_norm)
+        best = int(np.argmax(sims)) if sims.size else -1
+
+        if best >= 0 and sims[best] >= SPEAKER_SIM_THRESHOLD:
+            best_profile = state["profiles"][best]
+            best_id = best_profile["id"]
+            count = best_profile["count"]
+            row = state["matrix"][best]
+            row *= count
+            row += emb
+            row /= count + 1
+            state["norms"][best] = _vector_norm(row)
+            best_profile["count"] = count + 1
+            label_map[label] = best_id
         else:
             new_id = f"SPEAKER_{state['next_id']:02d}"
             state["next_id"] += 1
             state["profiles"].append({
                 "id": new_id,
-                "embedding": emb,
                 "count": 1
             })
-            seg["speaker"] = new_id
-            label_cache[label] = new_id
-            state_changed = True
+            if state.get("matrix") is None:
+                state["matrix"] = emb[np.newaxis, :].copy()
+                state["norms"] = np.array([emb_norm], dtype=np.float32)
+            else:
+                state["matrix"] = np.vstack((state["matrix"], emb))
+                state["norms"] = np.append(state["norms"], np.float32(emb_norm))
+            label_map[label] = new_id
+        state_changed = True
+
+    for seg in speaker_segments:
+        label = seg.get("speaker", "SPEAKER_00")
+        if label in label_map:
+            seg["speaker"] = label_map[label]
 
     _maybe_persist_state(session_id, state, state_changed)
     return speaker_segments
@@ -442,6 +615,14 @@ def assign_speakers_to_segments(transcription_segments: list, speaker_segments:
         # No diarization available, return segments without speaker info
         return transcription_segments
 
+    # Index speaker turns by start time. Turns may overlap, so a running max of
+    # end times bounds which earlier turns can still reach a given start.
+    spk_starts = np.fromiter((s["start"] for s in speaker_segments), dtype=np.float64, count=len(speaker_segments))
+    spk_ends = np.fromiter((s["end"] for s in speaker_segments), dtype=np.float64, count=len(speaker_segments))
+    order = np.argsort(spk_starts, kind="stable")
+    sorted_starts = spk_starts[order]
+    reach = np.maximum.accumulate(spk_ends[order])
+
     result = []
     for seg in transcription_segments:
         seg_start = seg["start"]
@@ -455,7 +636,11 @@ def assign_speakers_to_segments(transcription_segments: list, speaker_segments:
         overlap_by_speaker = {}
         total_overlap = 0.0
 
-        for spk in speaker_segments:
+        # Only turns in [lo, hi) can overlap: start before seg_end, reach past seg_start
+        lo = int(np.searchsorted(reach, seg_start, side="right"))
+        hi = int(np.searchsorted(sorted_starts, seg_end, side="left"))
+        for idx in order[lo:hi]:
+            spk = speaker_segments[idx]
             # Calculate overlap
             overlap = _segment_overlap(seg_start, seg_end, spk["start"], spk["end"])
             if overlap <= 0:
@@ -487,9 +672,8 @@ def assign_speakers_to_segments(transcription_segments: list, speaker_segments:
 
         # Still no speaker? Use the closest one
         if best_speaker is None and speaker_segments:
-            closest_spk = min(speaker_segments,
-                            key=lambda s: min(abs(s["start"] - seg_mid), abs(s["end"] - seg_mid)))
-            best_speaker = closest_spk["speaker"]
+            distance = np.minimum(np.abs(spk_starts - seg_mid), np.abs(spk_ends - seg_mid))
+            best_speaker = speaker_segments[int(np.argmin(distance))]["speaker"]
 
         result.append({
             **seg,
@@ -502,95 +686,315 @@ def assign_speakers_to_segments(transcription_segments: list, speaker_segments:
 
     return result
 
-def transcribe_audio_sync(audio_array: np.ndarray, language: str = None) -> str:
-    """Synchronous transcription function to run in thread pool"""
-    print(f"[THREAD] Starting transcription of {len(audio_array)} samples, language={language}")
-    try:
-        print("[THREAD] Calling model.transcribe()...")
-        segments, info = model.transcribe(
-            audio_array,
-            language=language,
-            beam_size=1,  # Faster for streaming
-            best_of=1,
-            vad_filter=False,  # We're doing VAD manually
-            condition_on_previous_text=True
-        )
+async def send_json_message(websocket: WebSocket, payload: dict) -> None:
+    """Send a JSON text frame serialized with orjson"""
+    await websocket.send_text(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode())
 
-        print(f"[THREAD] Transcription returned, detected language: {info.language}")
+_tokenizers: Dict[Optional[str], Tokenizer] = {}
 
-        # Process segments immediately - do NOT convert to list as it hangs
-        print("[THREAD] Processing segments directly from generator...")
-        text_parts = []
-        segment_count = 0
+def _get_tokenizer(language: Optional[str]) -> Tokenizer:
+    tokenizer = _tokenizers.get(language)
+    if tokenizer is None:
+        tokenizer = Tokenizer(
+            model.hf_tokenizer,
+            model.model.is_multilingual,
+            task="transcribe",
+            language=language
+        )
+        _tokenizers[language] = tokenizer
+    return tokenizer
+
+def _detect_language(encoder_output) -> tuple:
+    """One decoder step over <|startoftranscript|>, returns (language, probability)"""
+    if not model.model.is_multilingual:
+        return "en", 1.0
+    language_token, probability = model.model.detect_language(encoder_output)[0][0]
+    return language_token[2:-2], probability
+
+def detect_language_audio(audio_array: np.ndarray) -> tuple:
+    """Detect the language of the first 30s without decoding any text, returns (language, probability)"""
+    features = IncrementalLogMel(model.feature_extractor)(audio_array[:SAMPLE_RATE * 30])
+    return _detect_language(model.encode(features))
+
+def transcribe_features_batch(
+    features_list: list,
+    languages: list,
+    prefixes: Optional[list] = None,
+    contexts: Optional[list] = None
+) -> list:
+    """
+    Greedy-decode a batch of 30s feature windows with one CTranslate2 encode/generate call.
+    Skips transcribe()'s feature extraction, temperature fallback and segment bookkeeping.
+    Each window may carry a prefix of already-agreed token ids that is forwarded as
+    part of the prompt instead of being decoded again, and a context string (the
+    previous segment's text) whose last PROMPT_CONTEXT_TOKENS tokens go after
+    <|startofprev|>.
+    Returns a list of (text, language, token_ids).
+    """
+    if prefixes is None:
+        prefixes = [[] for _ in features_list]
+    if contexts is None:
+        contexts = ["" for _ in features_list]
+
+    # Every window is exactly nb_max_frames long, so the batch stacks without padding
+    encoder_output = model.encode(np.stack(features_list))
+
+    languages = list(languages)
+    if any(language is None for language in languages):
+        if model.model.is_multilingual:
+            detected = model.model.detect_language(encoder_output)
+            languages = [
+                language if language is not None else detected[i][0][0][2:-2]
+                for i, language in enumerate(languages)
+            ]
+        else:
+            languages = [language or "en" for language in languages]
+
+    tokenizers = [_get_tokenizer(language) for language in languages]
+    prompts = []
+    for tokenizer, prefix, context in zip(tokenizers, prefixes, contexts):
+        prompt = []
+        if context:
+            prompt = [tokenizer.sot_prev] + tokenizer.encode(" " + context.strip())[-PROMPT_CONTEXT_TOKENS:]
+        prompts.append(prompt + list(tokenizer.sot_sequence) + [tokenizer.no_timestamps] + list(prefix))
+    results = model.model.generate(
+        encoder_output,
+        prompts,
+        beam_size=1,
+        return_scores=True,
+        return_no_speech_prob=True,
+        include_prompt_in_result=False,  # Forward the prompt in one pass, only decode new tokens
+        suppress_blank=True,
+        suppress_tokens=[-1]
+    )
 
+    outputs = []
+    for result, tokenizer, language, prefix in zip(results, tokenizers, languages, prefixes):
+        # Same silence rule as transcribe(): high no-speech probability and low confidence
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.scores[0] < -1.0:
+            outputs.append(("", language, []))
+        else:
+            tokens = list(prefix) + result.sequences_ids[0]
+            outputs.append((tokenizer.decode(tokens).strip(), language, tokens))
+    return outputs
+
+def transcribe_features(features: np.ndarray, language: Optional[str] = None) -> tuple:
+    """Greedy-decode a single 30s feature window, returns (text, language)"""
+    text, language, _ = transcribe_features_batch([features], [language])[0]
+    return text, language
+
+# Cross-session batching: streaming partials from all sockets are coalesced
+# into one encoder/decoder call instead of queueing on the GPU one by one
+transcribe_queue: Optional[asyncio.Queue] = None
+batch_worker_task: Optional[asyncio.Task] = None
+
+async def _batch_worker(queue: asyncio.Queue):
+    """Collect queued windows for up to STREAM_BATCH_WAIT seconds / STREAM_BATCH_MAX items and decode them together"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + STREAM_BATCH_WAIT
+        while len(batch) < STREAM_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        features_list, languages, prefixes, contexts, futures = zip(*batch)
+        if len(batch) > 1:
+            logger.debug("Batching %d streaming windows", len(batch))
         try:
-            for seg in segments:
-                segment_count += 1
-                segment_text = seg.text.strip()
-                print(f"[THREAD] Segment {segment_count}: '{segment_text}'")
-                if segment_text:
-                    text_parts.append(segment_text)
-                # Break after 50 segments to avoid hanging
-                if segment_count > 50:
-                    print("[THREAD] Reached max segment limit")
-                    break
+            results = await run_model(
+                transcribe_features_batch,
+                list(features_list),
+                list(languages),
+                list(prefixes),
+                list(contexts)
+            )
         except Exception as e:
-            print(f"[THREAD] Error iterating segments: {e}")
-            import traceback
-            traceback.print_exc()
-
-        print(f"[THREAD] Processed {segment_count} segments total")
-        text = " ".join(text_parts)
-        print(f"[THREAD] Final text: '{text}'")
-        return text
-    except Exception as e:
-        print(f"[THREAD] Transcription error in sync function: {e}")
-        import traceback
-        traceback.print_exc()
-        return ""
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, result in zip(futures, results):
+                if not future.done():
+                    future.set_result(result)
+
+async def enqueue_transcription(
+    features: np.ndarray,
+    language: Optional[str],
+    prefix: Optional[list] = None,
+    context: str = ""
+) -> tuple:
+    """Queue one feature window for the shared batch worker and wait for its (text, language, token_ids)"""
+    global transcribe_queue, batch_worker_task
+    if transcribe_queue is None:
+        transcribe_queue = asyncio.Queue()
+        batch_worker_task = asyncio.create_task(_batch_worker(transcribe_queue))
+    future = asyncio.get_running_loop().create_future()
+    await transcribe_queue.put((features, language, prefix or [], context, future))
+    return await future
+
+# Warm up the CTranslate2 encoder/decoder and VAD so the first streaming partial
+# doesn't pay for CUDA context setup, kernel selection and allocator growth
+print("Warming up models...")
+warmup_start = time.time()
+transcribe_features(IncrementalLogMel(model.feature_extractor)(np.zeros(SAMPLE_RATE, dtype=np.float32)))
+vad_session.run(None, {
+    "input": np.zeros((1, VAD_CONTEXT_SIZE + VAD_WINDOW_SIZE), dtype=np.float32),
+    "state": np.zeros((2, 1, 128), dtype=np.float32),
+    "sr": VAD_SR
+})
+# faster-whisper's own Silero session (vad_filter=True, batched pipeline) is created lazily
+# on first use; build it now so the first HTTP request doesn't pay for it
+get_vad_model()
+print(f"Warm-up finished in {time.time() - warmup_start:.1f}s")
 
 class StreamingTranscriber:
     def __init__(self, language: str = None):
         self.language = language
-        self.audio_buffer = deque(maxlen=int(SAMPLE_RATE * 30))  # 30 second rolling buffer
-        self.segment_buffer = []
+        # Preallocated float32 buffers: slicing is a view, no per-sample Python objects
+        self.audio_buffer = np.zeros(AUDIO_BUFFER_SAMPLES, dtype=np.float32)  # 30 second ring buffer
+        self.audio_write = 0  # Total samples ever written; ring position is audio_write % size
+        self.segment_buffer = np.zeros(int(SAMPLE_RATE * MAX_SEGMENT_DURATION * 2), dtype=np.float32)
+        self.seg_write = 0  # Samples in the current segment
+        self.last_vad_pos = 0  # seg_write at the previous VAD call
         self.last_speech_time = time.time()
         self.segment_start_time = time.time()  # Track when segment started
+        self.data_event = asyncio.Event()  # Set by add_audio once a VAD hop of new audio is buffered
+        # Silero v5 recurrent state and [context | window] input, carried between calls
+        self.vad_state = np.zeros((2, 1, 128), dtype=np.float32)
+        self.vad_input = np.zeros((1, VAD_CONTEXT_SIZE + VAD_WINDOW_SIZE), dtype=np.float32)
         self.current_text = ""
+        self.current_language = "unknown"
+        # Local agreement: tokens shared by the last two hypotheses of this segment are
+        # committed and forced as a decoder prefix, so each tick only decodes the new tail
+        self.segment_language = None
+        self.previous_tokens = []
+        self.committed_tokens = []
+        # Text of the previous finalized segment, used as bounded decoder context
+        self.context_text = ""
+        self.last_transcribed_len = 0  # Segment length at the last transcription attempt
+        # Finalized segments with absolute sample offsets, reused on disconnect
         self.finalized_segments = []
+        self.log_mel = IncrementalLogMel(model.feature_extractor)
         
     def add_audio(self, audio_chunk: np.ndarray):
         """Add audio chunk to buffer"""
-        self.audio_buffer.extend(audio_chunk)
-        self.segment_buffer.extend(audio_chunk)
+        # Rolling buffer: wrap-around copy, keeping only the newest samples
+        size = self.audio_buffer.shape[0]
+        ring_chunk = audio_chunk
+        if len(ring_chunk) > size:
+            self.audio_write += len(ring_chunk) - size
+            ring_chunk = ring_chunk[-size:]
+        n = len(ring_chunk)
+        pos = self.audio_write % size
+        first = min(n, size - pos)
+        self.audio_buffer[pos:pos + first] = ring_chunk[:first]
+        self.audio_buffer[:n - first] = ring_chunk[first:]
+        self.audio_write += n
+
+        # Segment buffer: append, doubling capacity on overflow
+        end = self.seg_write + len(audio_chunk)
+        if end > self.segment_buffer.shape[0]:
+            grown = np.zeros(max(end, 2 * self.segment_buffer.shape[0]), dtype=np.float32)
+            grown[:self.seg_write] = self.segment_buffer[:self.seg_write]
+            self.segment_buffer = grown
+        self.segment_buffer[self.seg_write:end] = audio_chunk
+        self.seg_write = end
+
+        if self.seg_write - self.last_vad_pos >= VAD_HOP_SAMPLES:
+            self.data_event.set()
+
+    def get_full_audio(self) -> np.ndarray:
+        """Return the rolling buffer contents in chronological order"""
+        size = self.audio_buffer.shape[0]
+        if self.audio_write <= size:
+            return self.audio_buffer[:self.audio_write].copy()
+        pos = self.audio_write % size
+        return np.concatenate((self.audio_buffer[pos:], self.audio_buffer[:pos]))
         
-    def check_vad(self, audio_chunk: np.ndarray) -> float:
-        """Check if audio contains speech"""
-        if len(audio_chunk) < 512:
+    def check_vad(self, audio_chunk: np.ndarray, num_windows: int = 1) -> float:
+        """Check if audio contains speech (max probability over the trailing 512-sample windows)"""
+        if len(audio_chunk) < VAD_WINDOW_SIZE:
             return 0.0
 
         try:
-            # Ensure audio is float32 and normalized
-            audio_chunk = audio_chunk.astype(np.float32)
-
-            # VAD expects exactly 512 samples for 16kHz
-            # Take the last 512 samples if we have more
-            if len(audio_chunk) > 512:
-                audio_chunk = audio_chunk[-512:]
-
-            # Convert to tensor
-            audio_tensor = torch.from_numpy(audio_chunk).float()
-
-            # Get speech probability
-            speech_prob = vad_model(audio_tensor, SAMPLE_RATE).item()
+            # VAD expects whole 512-sample windows for 16kHz
+            num_windows = max(1, min(num_windows, VAD_MAX_WINDOWS, len(audio_chunk) // VAD_WINDOW_SIZE))
+            audio_chunk = audio_chunk[-num_windows * VAD_WINDOW_SIZE:]
+
+            # Near-silent audio can't be speech: skip the neural VAD on a mean-square check
+            if np.dot(audio_chunk, audio_chunk) < VAD_ENERGY_FLOOR * len(audio_chunk):
+                return 0.0
+
+            # Feed windows through the ONNX graph in order, carrying this session's state
+            speech_prob = 0.0
+            for start in range(0, len(audio_chunk), VAD_WINDOW_SIZE):
+                self.vad_input[0, :VAD_CONTEXT_SIZE] = self.vad_input[0, -VAD_CONTEXT_SIZE:]
+                self.vad_input[0, VAD_CONTEXT_SIZE:] = audio_chunk[start:start + VAD_WINDOW_SIZE]
+                out, self.vad_state = vad_session.run(None, {
+                    "input": self.vad_input,
+                    "state": self.vad_state,
+                    "sr": VAD_SR
+                })
+                speech_prob = max(speech_prob, float(out[0][0]))
             return speech_prob
         except Exception as e:
             print(f"VAD error: {e}")
             # Calculate RMS as fallback
-            rms = np.sqrt(np.mean(audio_chunk ** 2))
             # If RMS > 0.01, likely speech
-            return 0.9 if rms > 0.01 else 0.1
+            return 0.9 if rms(audio_chunk) > 0.01 else 0.1
     
+    async def transcribe_segment(self, audio_array: np.ndarray) -> tuple:
+        """Transcribe the current segment off the event loop, returns (text, language)"""
+        loop = asyncio.get_running_loop()
+        if len(audio_array) <= self.log_mel.max_samples:
+            # Fits in one window: reuse cached mel frames from previous ticks and
+            # share the encoder/decoder call with other sessions' partials
+            features = await loop.run_in_executor(executor, self.log_mel, audio_array)
+            language = self.language or self.segment_language
+            # Prefix tokens are language-specific, so only force them once the language is pinned
+            prefix = self.committed_tokens if language else []
+            text, language, tokens = await enqueue_transcription(features, language, prefix, self.context_text)
+
+            common = 0
+            for a, b in zip(self.previous_tokens, tokens):
+                if a != b:
+                    break
+                common += 1
+            self.committed_tokens = tokens[:max(common, len(prefix))] if tokens else []
+            self.previous_tokens = tokens
+            self.segment_language = language
+            return text, language
+
+        self.previous_tokens = []
+        self.committed_tokens = []
+        return await run_model(self.transcribe_long_segment, audio_array)
+
+    def transcribe_long_segment(self, audio_array: np.ndarray) -> tuple:
+        """Blocking transcription of a segment longer than one window, returns (text, language)"""
+        segments, info = model.transcribe(
+            audio_array,
+            language=self.language,
+            beam_size=1,  # Greedy decoding for streaming
+            temperature=0.0,  # More deterministic
+            compression_ratio_threshold=2.4,
+            # Partials are redone every tick; prompting each window with the previous
+            # one grows decoder work and feeds hallucinations back in. The previous
+            # finalized segment is passed instead as a short, fixed-size prompt.
+            condition_on_previous_text=False,
+            initial_prompt=self.context_text or None,
+            vad_filter=False  # We're doing VAD manually
+        )
+
+        # Iterate the generator directly (list(segments) can hang)
+        text = "".join(seg.text for seg in segments).strip()
+        return text, info.language or "unknown"
+
     async def process_streaming(self, websocket: WebSocket):
         """Process audio in streaming mode"""
         last_transcribe_time = time.time()
@@ -600,27 +1004,39 @@ class StreamingTranscriber:
         print(f"Starting processing loop for session")
 
         while True:
-            await asyncio.sleep(0.1)  # Check every 100ms
+            # Sleep until add_audio() signals new audio; the timeout still lets
+            # silence finalization fire when the client stops sending
+            try:
+                await asyncio.wait_for(self.data_event.wait(), timeout=SILENCE_DURATION)
+            except asyncio.TimeoutError:
+                pass
+            self.data_event.clear()
 
             current_time = time.time()
 
             # Need minimum audio before processing
-            if len(self.segment_buffer) < CHUNK_SIZE:
+            if self.seg_write < CHUNK_SIZE:
                 continue
 
             # Get the latest chunk for VAD
-            audio_chunk = np.array(list(self.segment_buffer)[-CHUNK_SIZE:])
+            audio_chunk = self.segment_buffer[self.seg_write - CHUNK_SIZE:self.seg_write]
 
-            try:
-                speech_prob = self.check_vad(audio_chunk)
-                # Only log if speech detected
-                if speech_prob > VAD_THRESHOLD:
-                    print(f"Speech detected: prob={speech_prob:.3f}, buffer_size={len(self.segment_buffer)}")
-            except Exception as e:
-                print(f"VAD error: {e}, using fallback")
-                # Calculate RMS as fallback
-                rms = np.sqrt(np.mean(audio_chunk ** 2))
-                speech_prob = 0.9 if rms > 0.01 else 0.1
+            if self.seg_write == self.last_vad_pos:
+                speech_prob = 0.0  # Woke on timeout: nothing new arrived, treat as silence
+            else:
+                # Score every window that arrived since the previous tick
+                vad_windows = min(VAD_MAX_WINDOWS, max(1, (self.seg_write - self.last_vad_pos) // VAD_WINDOW_SIZE))
+                self.last_vad_pos = self.seg_write
+
+                try:
+                    speech_prob = self.check_vad(audio_chunk, vad_windows)
+                    # Only log if speech detected
+                    if speech_prob > VAD_THRESHOLD:
+                        logger.debug("Speech detected: prob=%.3f, buffer_size=%d", speech_prob, self.seg_write)
+                except Exception as e:
+                    print(f"VAD error: {e}, using fallback")
+                    # Calculate RMS as fallback
+                    speech_prob = 0.9 if rms(audio_chunk) > 0.01 else 0.1
 
             if speech_prob > VAD_THRESHOLD:
                 self.last_speech_time = current_time
@@ -628,65 +1044,57 @@ class StreamingTranscriber:
                 # Transcribe if:
                 # 1. Enough time has passed since last transcription
                 # 2. We have enough audio (at least 2 seconds)
+                # 3. The segment grew since the last attempt (same audio gives the same result)
                 time_since_last = current_time - last_transcribe_time
-                has_enough_audio = len(self.segment_buffer) >= min_audio_length
+                has_enough_audio = self.seg_write >= min_audio_length
+                has_new_audio = self.seg_write > self.last_transcribed_len
 
-                if time_since_last >= min_transcribe_interval and has_enough_audio:
+                if time_since_last >= min_transcribe_interval and has_enough_audio and has_new_audio:
                     # Transcribe the ENTIRE segment buffer
-                    audio_array = np.array(self.segment_buffer, dtype=np.float32)
+                    audio_array = self.segment_buffer[:self.seg_write]
+                    self.last_transcribed_len = self.seg_write
 
-                    print(f"Transcribing {len(audio_array)} samples ({len(audio_array)/SAMPLE_RATE:.1f}s)...")
+                    logger.debug("Transcribing %d samples (%.1fs)...", len(audio_array), len(audio_array) / SAMPLE_RATE)
 
                     try:
-                        # Use OpenAI Whisper
-                        print("Transcribing with OpenAI Whisper...")
-
-                        # Transcribe using OpenAI Whisper with better settings
-                        result = whisper_model.transcribe(
-                            audio_array,
-                            language=self.language,
-                            fp16=(DEVICE == "cuda"),
-                            verbose=False,
-                            temperature=0.0,  # More deterministic
-                            compression_ratio_threshold=2.4,
-                            condition_on_previous_text=True
-                        )
-
-                        text = result["text"].strip()
-                        detected_lang = result.get("language", "unknown")
-
-                        print(f"Transcription complete! Detected: {detected_lang}")
-                        print(f"Result: '{text}'")
+                        logger.debug("Transcribing with faster-whisper...")
+
+                        # Inference runs in the thread pool so the event loop keeps receiving audio
+                        text, detected_lang = await self.transcribe_segment(audio_array)
+
+                        logger.debug("Transcription complete! Detected: %s", detected_lang)
+                        logger.debug("Result: '%s'", text)
 
                         # Filter out hallucinations (repetitive punctuation, thank you, etc.)
                         is_hallucination = False
                         if text:
                             # Check for repetitive characters (hallucination indicator)
-                            if len(set(text.replace(" ", ""))) <= 3:  # Only 3 or fewer unique chars
+                            if len(set(text)) - (" " in text) <= 3:  # Only 3 or fewer unique non-space chars
                                 is_hallucination = True
-                                print(f"⚠️ Hallucination detected (repetitive): '{text[:50]}...'")
+                                logger.debug("Hallucination detected (repetitive): '%s...'", text[:50])
                             # Check for common hallucination phrases
-                            elif any(phrase in text.lower() for phrase in ["thank you", "thanks for watching", "subscribe"]):
+                            elif HALLUCINATION_RE.search(text):
                                 is_hallucination = True
-                                print(f"⚠️ Hallucination detected (common phrase): '{text}'")
+                                logger.debug("Hallucination detected (common phrase): '%s'", text)
 
                         if text and not is_hallucination:
                             # Update current text (don't check if different - Whisper refines as it gets more audio)
                             self.current_text = text
+                            self.current_language = detected_lang
 
                             # Send partial result
-                            await websocket.send_json({
+                            await send_json_message(websocket, {
                                 "type": "partial",
                                 "text": text,
                                 "is_final": False
                             })
 
-                            print(f"✅ Sent partial: '{text}'")
+                            logger.debug("Sent partial: '%s'", text)
                             last_transcribe_time = current_time
                         elif not text:
-                            print("No text transcribed (empty result)")
+                            logger.debug("No text transcribed (empty result)")
                         elif is_hallucination:
-                            print("Skipping hallucinated text")
+                            logger.debug("Skipping hallucinated text")
 
                     except Exception as e:
                         print(f"Transcription error: {e}")
@@ -705,15 +1113,27 @@ class StreamingTranscriber:
                 reason = "silence" if silence_duration >= SILENCE_DURATION else f"max duration ({segment_duration:.1f}s)"
                 print(f"Finalizing segment after {reason}: '{self.current_text}'")
 
-                await websocket.send_json({
+                await send_json_message(websocket, {
                     "type": "final",
                     "text": self.current_text,
                     "is_final": True
                 })
 
-                self.finalized_segments.append(self.current_text)
+                self.finalized_segments.append({
+                    "text": self.current_text,
+                    "start_sample": self.audio_write - self.seg_write,
+                    "end_sample": self.audio_write,
+                    "language": self.current_language
+                })
+                self.context_text = self.current_text[-PROMPT_CONTEXT_CHARS:]
                 self.current_text = ""
-                self.segment_buffer.clear()
+                self.segment_language = None
+                self.previous_tokens = []
+                self.committed_tokens = []
+                self.seg_write = 0
+                self.last_vad_pos = 0
+                self.last_transcribed_len = 0
+                self.log_mel.reset()
                 self.segment_start_time = current_time  # Reset timer
                 print("Segment buffer cleared, ready for next segment")
 
@@ -735,6 +1155,9 @@ async def websocket_endpoint(websocket: WebSocket):
     process_task = asyncio.create_task(transcriber.process_streaming(websocket))
     
     chunk_count = 0
+    # Reusable conversion buffer; add_audio copies out of it, so each message
+    # costs one memcpy into the ring instead of a fresh float32 allocation
+    staging = np.empty(64 * 1024, dtype=np.float32)
     try:
         while True:
             # Receive audio data
@@ -746,25 +1169,27 @@ async def websocket_endpoint(websocket: WebSocket):
             chunk_count += 1
 
             # Convert bytes to float32 PCM
-            audio_chunk = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+            if len(data) // 2 > staging.shape[0]:
+                staging = np.empty(len(data) // 2, dtype=np.float32)
+            audio_chunk = pcm16_to_float32(data, out=staging)
 
             # Add to transcriber
             transcriber.add_audio(audio_chunk)
 
             # Log every 50 chunks for debugging
             if chunk_count % 50 == 0:
-                print(f"Received chunk #{chunk_count}: {len(data)} bytes, {len(audio_chunk)} samples, buffer total: {len(transcriber.audio_buffer)} samples")
+                logger.debug("Received chunk #%d: %d bytes, %d samples, buffer total: %d samples", chunk_count, len(data), len(audio_chunk), transcriber.audio_write)
 
             # Log occasionally
-            if len(transcriber.audio_buffer) % 160000 == 0:  # Every 10 seconds
-                print(f"Received audio: total {len(transcriber.audio_buffer)} samples")
+            if transcriber.audio_write // 160000 != (transcriber.audio_write - len(audio_chunk)) // 160000:  # Every 10 seconds
+                logger.debug("Received audio: total %d samples", transcriber.audio_write)
             
     except WebSocketDisconnect:
         print("Client disconnected")
         process_task.cancel()
 
         # Return full recording audio for final processing
-        full_audio = np.array(list(transcriber.audio_buffer), dtype=np.float32)
+        full_audio = transcriber.get_full_audio()
 
         print(f"Session ended. Collected {len(full_audio)} samples ({len(full_audio)/SAMPLE_RATE:.1f}s)")
         print(f"Finalized {len(transcriber.finalized_segments)} segments")
@@ -772,28 +1197,55 @@ async def websocket_endpoint(websocket: WebSocket):
         # Perform high-quality re-transcription of full audio
         if len(full_audio) > SAMPLE_RATE * 2:  # Only if we have at least 2 seconds
             print("🔄 Starting high-quality re-transcription of full audio...")
+            # Diarization only needs the audio, so start it now and let it run
+            # in the thread pool while the transcription tail is decoded
+            diarization_future = asyncio.get_running_loop().run_in_executor(
+                executor, perform_speaker_diarization, full_audio
+            )
             try:
-                # Step 1: Transcribe with Whisper
-                condition_on_prev = transcriber.language is not None
-                result = whisper_model.transcribe(
-                    full_audio,
-                    language=transcriber.language,
-                    fp16=(DEVICE == "cuda"),
-                    verbose=False,
-                    temperature=0.0,
-                    compression_ratio_threshold=2.4,
-                    condition_on_previous_text=condition_on_prev,
-                    word_timestamps=True  # Get word-level timestamps for better segmentation
+                # Step 1: Reuse segments already finalized while streaming and
+                # only transcribe the audio after the last one
+                window_start = transcriber.audio_write - len(full_audio)
+                reused_segments = [
+                    seg for seg in transcriber.finalized_segments
+                    if seg["start_sample"] >= window_start
+                ]
+                segments_with_timestamps = [
+                    {
+                        "text": seg["text"],
+                        "start": (seg["start_sample"] - window_start) / SAMPLE_RATE,
+                        "end": (seg["end_sample"] - window_start) / SAMPLE_RATE
+                    }
+                    for seg in reused_segments
+                ]
+                language = reused_segments[-1]["language"] if reused_segments else "unknown"
+                tail_start = reused_segments[-1]["end_sample"] - window_start if reused_segments else 0
+                tail_audio = full_audio[tail_start:]
+                print(f"   Reusing {len(reused_segments)} streamed segment(s), transcribing {len(tail_audio)/SAMPLE_RATE:.1f}s tail")
+
+                if len(tail_audio) >= SAMPLE_RATE // 2:  # Skip sub-0.5s tails
+                    # VAD-chunked and batched; CTranslate2 decodes all beams as one batch
+                    # with a shared KV cache
+                    tail_segments, tail_language = await run_model(
+                        transcribe_batched, tail_audio, transcriber.language, beam_size=5
+                    )
+
+                    tail_offset = tail_start / SAMPLE_RATE
+                    for seg in tail_segments:
+                        seg["start"] += tail_offset
+                        seg["end"] += tail_offset
+                    segments_with_timestamps.extend(tail_segments)
+                    language = tail_language or language
+
+                final_text = " ".join(
+                    seg["text"].strip() for seg in segments_with_timestamps if seg["text"].strip()
                 )
 
-                final_text = result["text"].strip()
-                segments_with_timestamps = result.get("segments", [])
-
                 print(f"✅ High-quality transcription complete: '{final_text[:100]}...'")
                 print(f"   Got {len(segments_with_timestamps)} segments with timestamps")
 
-                # Step 2: Perform speaker diarization
-                speaker_segments = perform_speaker_diarization(full_audio)
+                # Step 2: Collect speaker diarization (started alongside transcription)
+                speaker_segments = await diarization_future
 
                 # Step 3: Merge transcription segments with speaker labels
                 transcription_segments = [
@@ -819,7 +1271,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 session_transcriptions[session_id] = {
                     "full_text": final_text,
                     "segments": segments_with_speakers,
-                    "language": result.get("language", "unknown"),
+                    "language": language,
                     "duration": len(full_audio) / SAMPLE_RATE,
                     "num_speakers": unique_speakers
                 }
@@ -852,46 +1304,42 @@ async def transcribe_audio(request: Request):
         print(f"📝 Transcription request: {len(audio_data)} bytes, language={language}")
 
         # Convert WAV bytes to numpy array
-        import io
-        import wave
-
-        wav_file = io.BytesIO(audio_data)
-        with wave.open(wav_file, 'rb') as wav:
-            frames = wav.readframes(wav.getnframes())
-            audio_array = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+        audio_array = wav_bytes_to_float32_mono(audio_data)
 
         print(f"   Audio: {len(audio_array)} samples ({len(audio_array)/SAMPLE_RATE:.1f}s)")
 
-        # Transcribe with Whisper
-        result = whisper_model.transcribe(
+        # Transcribe with faster-whisper (greedy decode, built-in VAD skips silence)
+        # in the thread pool so other sessions keep being served
+        text, detected_lang = await run_model(
+            transcribe_text,
             audio_array,
             language=language,
-            fp16=(DEVICE == "cuda"),
-            verbose=False,
+            beam_size=1,
+            best_of=1,
             temperature=0.0,
             compression_ratio_threshold=2.4,
-            condition_on_previous_text=True
+            condition_on_previous_text=False,
+            vad_filter=True,
+            no_speech_threshold=0.4
         )
-
-        text = result["text"].strip()
-        detected_lang = result.get("language", "unknown")
+        detected_lang = detected_lang or "unknown"
 
         print(f"   ✅ Transcribed: '{text[:100]}...' (lang: {detected_lang})")
 
-        return JSONResponse(content={"text": text, "language": detected_lang})
+        return ORJSONResponse(content={"text": text, "language": detected_lang})
 
     except Exception as e:
         print(f"❌ Transcription error: {e}")
         import traceback
         traceback.print_exc()
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e)}
         )
 
 @app.post("/detect-language")
 async def detect_language(request: Request):
-    """HTTP endpoint for language detection"""
+    """HTTP endpoint for language detection (?include_text=true also returns a transcript sample)"""
     try:
         # Get audio data from request body
         audio_data = await request.body()
@@ -899,28 +1347,32 @@ async def detect_language(request: Request):
         print(f"🔍 Language detection request: {len(audio_data)} bytes")
 
         # Convert WAV bytes to numpy array
-        import io
-        import wave
-
-        wav_file = io.BytesIO(audio_data)
-        with wave.open(wav_file, 'rb') as wav:
-            frames = wav.readframes(wav.getnframes())
-            audio_array = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+        audio_array = wav_bytes_to_float32_mono(audio_data)
+
+        if request.query_params.get("include_text", "").lower() != "true":
+            # Encoder pass + a single decoder step; no text is decoded
+            detected_lang, probability = await run_model(detect_language_audio, audio_array)
+            print(f"   ✅ Detected language: {detected_lang} (p={probability:.2f})")
+            return ORJSONResponse(content={
+                "language": detected_lang,
+                "probability": probability
+            })
 
-        # Transcribe just to detect language (fast, no full transcription)
-        result = whisper_model.transcribe(
+        # Caller also wants text: transcribe the first 30 seconds
+        text, detected_lang = await run_model(
+            transcribe_text,
             audio_array[:SAMPLE_RATE * 30],  # Use first 30 seconds max
-            fp16=(DEVICE == "cuda"),
-            verbose=False,
-            temperature=0.0
+            beam_size=1,
+            temperature=0.0,
+            vad_filter=False
         )
 
-        detected_lang = result.get("language", "unknown")
-        text_sample = result["text"].strip()[:100]
+        detected_lang = detected_lang or "unknown"
+        text_sample = text[:100]
 
         print(f"   ✅ Detected language: {detected_lang}, sample: '{text_sample}...'")
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "language": detected_lang,
             "text": text_sample
         })
@@ -929,7 +1381,7 @@ async def detect_language(request: Request):
         print(f"❌ Language detection error: {e}")
         import traceback
         traceback.print_exc()
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e)}
         )
@@ -947,40 +1399,13 @@ async def transcribe_with_diarization(request: Request):
             language = None
 
         session_id = request.query_params.get("session_id")
-        print(f"📝🎭 Transcription + Diarization request: {len(audio_data)} bytes, language={language}, session={session_id}")
-
-        # Convert WAV bytes to numpy array
-        import io
-        import wave
-
-        wav_file = io.BytesIO(audio_data)
-        with wave.open(wav_file, 'rb') as wav:
-            frames = wav.readframes(wav.getnframes())
-            audio_array = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
-
-        print(f"   Audio: {len(audio_array)} samples ({len(audio_array)/SAMPLE_RATE:.1f}s)")
+        logger.info("📝🎭 Transcription + Diarization request: %d bytes, language=%s, session=%s", len(audio_data), language, session_id)
 
-        # Step 1: Transcribe with Whisper
-        condition_on_prev = language is not None
-        result = whisper_model.transcribe(
-            audio_array,
-            language=language,
-            fp16=(DEVICE == "cuda"),
-            verbose=False,
-            temperature=0.0,
-            compression_ratio_threshold=2.4,
-            condition_on_previous_text=condition_on_prev,
-            word_timestamps=True
-        )
-
-        full_text = result["text"].strip()
-        detected_lang = result.get("language", "unknown")
-        segments_with_timestamps = result.get("segments", [])
+        # Raw framed float32 is used as-is; anything else is decoded as WAV
+        audio_array = decode_audio_body(audio_data, request.headers.get("content-type", ""))
 
-        print(f"   ✅ Transcribed: '{full_text[:100]}...' (lang: {detected_lang})")
-        print(f"   Got {len(segments_with_timestamps)} segments")
+        logger.info("   Audio: %d samples (%.1fs)", len(audio_array), len(audio_array) / SAMPLE_RATE)
 
-        # Step 2: Perform speaker diarization
         min_speakers = request.query_params.get("min_speakers")
         max_speakers = request.query_params.get("max_speakers")
         strictness = request.query_params.get("strictness")
@@ -991,14 +1416,38 @@ async def transcribe_with_diarization(request: Request):
         except ValueError:
             strictness = None
 
-        speaker_segments = perform_speaker_diarization(
-            audio_array,
-            min_speakers=min_speakers,
-            max_speakers=max_speakers,
-            strictness=strictness
+        # Diarization runs on the executor alongside Whisper; only the Whisper
+        # step is gated by the model slots
+        loop = asyncio.get_running_loop()
+        diarization_future = loop.run_in_executor(
+            executor,
+            functools.partial(
+                perform_speaker_diarization,
+                audio_array,
+                min_speakers=min_speakers,
+                max_speakers=max_speakers,
+                strictness=strictness
+            )
         )
+
+        # Step 1: Transcribe with Whisper (VAD chunks batched through the encoder/decoder)
+        try:
+            segments_with_timestamps, detected_lang = await run_model(transcribe_batched, audio_array, language)
+        except Exception:
+            await asyncio.gather(diarization_future, return_exceptions=True)
+            raise
+        full_text = "".join(seg["text"] for seg in segments_with_timestamps).strip()
+        detected_lang = detected_lang or "unknown"
+
+        logger.info("   ✅ Transcribed: '%s...' (lang: %s)", full_text[:100], detected_lang)
+        logger.info("   Got %d segments", len(segments_with_timestamps))
+
+        # Step 2: Collect speaker diarization
+        speaker_segments = await diarization_future
         # Step 2.5: Stabilize speaker IDs across chunks (if session_id provided)
-        speaker_segments = assign_persistent_speakers(speaker_segments, audio_array, session_id)
+        speaker_segments = await loop.run_in_executor(
+            executor, assign_persistent_speakers, speaker_segments, audio_array, session_id
+        )
 
         # Step 3: Merge transcription segments with speaker labels
         transcription_segments = [
@@ -1018,20 +1467,21 @@ async def transcribe_with_diarization(request: Request):
 
         # Count unique speakers
         unique_speakers = len(set(s.get("speaker", "SPEAKER_00") for s in segments_with_speakers))
-        print(f"   👥 Identified {unique_speakers} unique speaker(s)")
+        logger.info("   👥 Identified %d unique speaker(s)", unique_speakers)
 
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "text": full_text,
             "language": detected_lang,
             "segments": segments_with_speakers,
             "num_speakers": unique_speakers
         })
 
+    except HTTPException as e:
+        # Malformed upload: reported as a client error in the endpoint's usual shape
+        return ORJSONResponse(status_code=e.status_code, content={"error": e.detail})
     except Exception as e:
-        print(f"❌ Transcription + Diarization error: {e}")
-        import traceback
-        traceback.print_exc()
-        return JSONResponse(
+        logger.exception("❌ Transcription + Diarization error: %s", e)
+        return ORJSONResponse(
             status_code=500,
             content={"error": str(e)}
         )
@@ -1044,12 +1494,12 @@ async def health():
 async def get_final_transcription(session_id: str):
     """Get the final high-quality transcription for a session"""
     if session_id in session_transcriptions:
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "data": session_transcriptions[session_id]
         })
     else:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=404,
             content={
                 "success": False,
@@ -1075,6 +1525,8 @@ if __name__ == "__main__":
         app, 
         host="0.0.0.0", 
         port=8003,
+        loop="uvloop",
+        http="httptools",
         timeout_keep_alive=300,  # 5 minutes keep-alive
         timeout_graceful_shutdown=30,  # 30 seconds for graceful shutdown
         ws_ping_interval=60,  # Send WebSocket pings every 60 seconds
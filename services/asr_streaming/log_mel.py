@@ -0,0 +1,69 @@
+"""
+Incremental Whisper log-mel features for the streaming transcriber (numpy only,
+so it can be tested without loading the ASR models).
+"""
+import numpy as np
+
+class IncrementalLogMel:
+    """
+    Whisper log-mel features for a growing audio buffer.
+    Mel power frames whose STFT window lies entirely inside the audio seen so far
+    never change when more audio is appended, so only the trailing frames are
+    recomputed on each call. Follows faster-whisper's feature extractor (centered
+    reflect-padded STFT, periodic Hann window, same mel filters and log scaling);
+    frames whose window is fully inside the audio match it, while trailing frames
+    are zero-padded rather than reflected and the output is padded to 30s.
+    """
+
+    def __init__(self, feature_extractor):
+        self.n_fft = feature_extractor.n_fft
+        self.hop_length = feature_extractor.hop_length
+        self.n_frames = feature_extractor.nb_max_frames
+        self.max_samples = self.n_frames * self.hop_length
+        self.mel_filters = np.asarray(feature_extractor.mel_filters, dtype=np.float32)
+        self.window = np.hanning(self.n_fft + 1)[:-1].astype(np.float32)
+        self.mel_power = np.zeros((self.mel_filters.shape[0], self.n_frames), dtype=np.float32)
+        self.stable_frames = 0
+
+    def reset(self):
+        """Forget cached frames (call when the segment buffer is cleared)"""
+        self.mel_power.fill(0.0)
+        self.stable_frames = 0
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        """Return (n_mels, n_frames) features; audio must only have grown since the last call"""
+        n = len(audio)
+        half = self.n_fft // 2
+        if n <= half:
+            # The centered STFT reflects `half` samples around index 0; zero-pad very
+            # short audio so there is something to reflect (stable_frames still uses n)
+            audio = np.pad(audio, (0, half + 1 - n))
+        padded_n = len(audio)
+        # Frames past the end of the audio only see zero padding and keep zero power
+        end = min(self.n_frames, (padded_n + half + self.hop_length - 1) // self.hop_length)
+        start = min(self.stable_frames, end)
+
+        if end > start:
+            lo = start * self.hop_length - half
+            hi = (end - 1) * self.hop_length + half
+            window_audio = np.zeros(hi - lo, dtype=np.float32)
+            a0 = max(lo, 0)
+            a1 = min(hi, padded_n)
+            window_audio[a0 - lo:a1 - lo] = audio[a0:a1]
+            if lo < 0:
+                # Centered STFT reflects the first samples around index 0
+                window_audio[:-lo] = audio[-lo:0:-1]
+
+            frames = np.lib.stride_tricks.sliding_window_view(window_audio, self.n_fft)[::self.hop_length]
+            spectrum = np.fft.rfft(frames * self.window, axis=-1)
+            power = spectrum.real ** 2 + spectrum.imag ** 2
+            self.mel_power[:, start:end] = self.mel_filters @ power.T.astype(np.float32)
+
+        # Frame t is final once its window [t*hop - half, t*hop + half) is fully inside the audio
+        self.stable_frames = min(self.n_frames, max(0, (n - half) // self.hop_length + 1))
+
+        log_spec = np.log10(np.maximum(self.mel_power, 1e-10))
+        np.maximum(log_spec, log_spec.max() - 8.0, out=log_spec)
+        log_spec += 4.0
+        log_spec /= 4.0
+        return log_spec
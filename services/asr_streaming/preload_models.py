@@ -1,28 +1,30 @@
 #!/usr/bin/env python3
 """Pre-download models during Docker build to avoid re-downloading on every container start"""
 
+import os
 import torch
-import whisper
+from faster_whisper import WhisperModel
 
 print("=" * 60)
 print("PRE-DOWNLOADING MODELS FOR DOCKER IMAGE")
 print("=" * 60)
 
-# Pre-download Whisper medium model
-print("\n1. Downloading Whisper medium model...")
-MODEL_SIZE = "medium"
+# Pre-download the faster-whisper (CTranslate2) model used at runtime
+MODEL_SIZE = os.getenv("ASR_MODEL", "large-v3-turbo")
+print(f"\n1. Downloading faster-whisper {MODEL_SIZE} model...")
 # Always use CPU during build - GPU not available at build time
 DEVICE = "cpu"
 print(f"   Device: {DEVICE} (GPU will be used at runtime)")
-whisper_model = whisper.load_model(MODEL_SIZE, device=DEVICE)
-print(f"   ✓ Whisper {MODEL_SIZE} model downloaded successfully")
+whisper_model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type="int8")
+print(f"   ✓ faster-whisper {MODEL_SIZE} model downloaded successfully")
 
 # Pre-download Silero VAD model
 print("\n2. Downloading Silero VAD model...")
 vad_model, utils = torch.hub.load(
     repo_or_dir='snakers4/silero-vad',
     model='silero_vad',
-    force_reload=False
+    force_reload=False,
+    onnx=True
 )
 print("   ✓ Silero VAD model downloaded successfully")
 
@@ -0,0 +1,51 @@
+"""Tests for IncrementalLogMel (run with: python -m unittest test_log_mel)"""
+import unittest
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from log_mel import IncrementalLogMel
+
+SAMPLE_RATE = 16000
+
+
+class IncrementalLogMelTest(unittest.TestCase):
+    def setUp(self):
+        self.extractor = FeatureExtractor()
+        rng = np.random.default_rng(0)
+        self.audio = (rng.standard_normal(SAMPLE_RATE * 3) * 0.1).astype(np.float32)
+        # Silent tail: FeatureExtractor reflects past the end where IncrementalLogMel
+        # zero-pads, and the two agree when the last samples are zero
+        self.audio[-SAMPLE_RATE // 10:] = 0.0
+
+    def test_matches_feature_extractor(self):
+        expected = self.extractor(self.audio, padding=0)
+        features = IncrementalLogMel(self.extractor)(self.audio)
+
+        self.assertEqual(features.shape, (self.extractor.mel_filters.shape[0], self.extractor.nb_max_frames))
+        np.testing.assert_allclose(features[:, :expected.shape[1]], expected, atol=1e-3)
+
+    def test_incremental_matches_single_pass(self):
+        log_mel = IncrementalLogMel(self.extractor)
+        for end in range(SAMPLE_RATE // 2, len(self.audio) + 1, SAMPLE_RATE // 2):
+            features = log_mel(self.audio[:end])
+
+        np.testing.assert_allclose(features, IncrementalLogMel(self.extractor)(self.audio), atol=1e-5)
+
+    def test_short_audio_is_zero_padded(self):
+        half = self.extractor.n_fft // 2
+        for n in (0, 1, 100, half, half + 1):
+            features = IncrementalLogMel(self.extractor)(self.audio[:n])
+            self.assertEqual(features.shape[1], self.extractor.nb_max_frames)
+            self.assertTrue(np.isfinite(features).all())
+
+    def test_growing_from_short_audio(self):
+        log_mel = IncrementalLogMel(self.extractor)
+        for end in (50, 150, 400, SAMPLE_RATE, len(self.audio)):
+            features = log_mel(self.audio[:end])
+
+        np.testing.assert_allclose(features, IncrementalLogMel(self.extractor)(self.audio), atol=1e-5)
+
+
+if __name__ == "__main__":
+    unittest.main()
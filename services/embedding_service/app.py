@@ -12,18 +12,27 @@ Endpoints:
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import List, Literal, Optional
+import asyncio
+import torch
 import uvicorn
 import logging
+import os
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pooling/torch-backend encode threads; the service runs alongside ASR and TTS
+torch.set_num_threads(int(os.getenv("TORCH_THREADS", "4")))
+torch.set_num_interop_threads(1)
+
 # Initialize FastAPI app
 app = FastAPI(
+    default_response_class=ORJSONResponse,
     title="Embedding Service",
     description="Text embedding generation using sentence-transformers",
     version="1.0.0"
@@ -40,11 +49,29 @@ app.add_middleware(
 
 # Load embedding model on startup
 MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
-logger.info(f"Loading embedding model: {MODEL_NAME}")
-model = SentenceTransformer(MODEL_NAME)
+# ONNX Runtime with the dynamically quantized INT8 export shipped in the model repo;
+# set EMBEDDING_BACKEND=torch to fall back to the PyTorch model
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "onnx")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+logger.info(f"Loading embedding model: {MODEL_NAME} (backend: {EMBEDDING_BACKEND})")
+if EMBEDDING_BACKEND == "onnx":
+    model = SentenceTransformer(
+        MODEL_NAME,
+        backend="onnx",
+        model_kwargs={"file_name": EMBEDDING_ONNX_FILE}
+    )
+else:
+    model = SentenceTransformer(MODEL_NAME)
 EMBEDDING_DIM = model.get_sentence_embedding_dimension()
 logger.info(f"Model loaded successfully. Embedding dimension: {EMBEDDING_DIM}")
 
+# Concurrent /embed calls are coalesced into one encode() of up to EMBED_BATCH_MAX
+# texts, waiting at most EMBED_BATCH_WAIT_MS for the batch to fill
+EMBED_BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "32"))
+EMBED_BATCH_WAIT = float(os.getenv("EMBED_BATCH_WAIT_MS", "5")) / 1000.0
+embed_queue: Optional[asyncio.Queue] = None
+embed_batch_task: Optional[asyncio.Task] = None
+
 
 # Request/Response models
 class EmbedRequest(BaseModel):
@@ -65,6 +92,8 @@ class EmbedResponse(BaseModel):
 
 class EmbedBatchRequest(BaseModel):
     texts: List[str]
+    # "binary" returns raw little-endian float32 rows (application/octet-stream)
+    response_format: Literal["json", "binary"] = "json"
 
     class Config:
         json_schema_extra = {
@@ -83,6 +112,47 @@ class EmbedBatchResponse(BaseModel):
     count: int
 
 
+async def _embed_batch_worker(queue: asyncio.Queue):
+    """Drain queued /embed texts into micro-batches and resolve each caller's future"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + EMBED_BATCH_WAIT
+        while len(batch) < EMBED_BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        texts, futures = zip(*batch)
+        try:
+            embeddings = await asyncio.to_thread(
+                model.encode,
+                list(texts),
+                convert_to_numpy=True,
+                batch_size=EMBED_BATCH_MAX,
+                show_progress_bar=False
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, embedding in zip(futures, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+
+@app.on_event("startup")
+async def start_embed_batcher():
+    global embed_queue, embed_batch_task
+    embed_queue = asyncio.Queue()
+    embed_batch_task = asyncio.create_task(_embed_batch_worker(embed_queue))
+
+
 # Endpoints
 @app.post("/embed", response_model=EmbedResponse)
 async def embed_text(request: EmbedRequest):
@@ -101,13 +171,16 @@ async def embed_text(request: EmbedRequest):
 
         logger.info(f"Generating embedding for text (length: {len(request.text)} chars)")
 
-        # Generate embedding
-        embedding = model.encode(request.text, convert_to_numpy=True)
+        # Generate embedding (batched with other concurrent /embed requests)
+        future = asyncio.get_running_loop().create_future()
+        await embed_queue.put((request.text, future))
+        embedding = await future
 
-        return EmbedResponse(
-            embedding=embedding.tolist(),
-            dimension=len(embedding)
-        )
+        # orjson serializes the numpy array directly, skipping .tolist()
+        return ORJSONResponse(content={
+            "embedding": embedding,
+            "dimension": len(embedding)
+        })
 
     except Exception as e:
         logger.error(f"Error generating embedding: {str(e)}")
@@ -123,7 +196,8 @@ async def embed_batch(request: EmbedBatchRequest):
         request: EmbedBatchRequest containing list of texts
 
     Returns:
-        EmbedBatchResponse with list of embedding vectors
+        EmbedBatchResponse with list of embedding vectors, or the raw
+        float32 matrix with X-Count/X-Dim headers when response_format is "binary"
     """
     try:
         if not request.texts:
@@ -137,19 +211,33 @@ async def embed_batch(request: EmbedBatchRequest):
 
         logger.info(f"Generating embeddings for {len(valid_texts)} texts (batch mode)")
 
-        # Generate embeddings in batch (more efficient)
-        embeddings = model.encode(
+        # Generate embeddings in batch (more efficient), off the event loop so the
+        # /embed batcher and other requests keep running
+        embeddings = await asyncio.to_thread(
+            model.encode,
             valid_texts,
             convert_to_numpy=True,
             batch_size=32,
             show_progress_bar=False
         )
 
-        return EmbedBatchResponse(
-            embeddings=embeddings.tolist(),
-            dimension=EMBEDDING_DIM,
-            count=len(embeddings)
-        )
+        if request.response_format == "binary":
+            return Response(
+                content=embeddings.astype("<f4", copy=False).tobytes(),
+                media_type="application/octet-stream",
+                headers={
+                    "X-Count": str(len(embeddings)),
+                    "X-Dim": str(EMBEDDING_DIM),
+                    "X-Dtype": "float32"
+                }
+            )
+
+        # orjson serializes the numpy array directly, skipping .tolist()
+        return ORJSONResponse(content={
+            "embeddings": embeddings,
+            "dimension": EMBEDDING_DIM,
+            "count": len(embeddings)
+        })
 
     except Exception as e:
         logger.error(f"Error generating batch embeddings: {str(e)}")
@@ -178,5 +266,7 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8006,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -2,8 +2,18 @@
 Preload embedding models during Docker build.
 This ensures the model is cached and ready when the container starts.
 """
+import os
 from sentence_transformers import SentenceTransformer
 
 print("Downloading sentence-transformers/all-MiniLM-L6-v2...")
 model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+
+# Also fetch the quantized ONNX export used at runtime
+onnx_file = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+print(f"Downloading ONNX export {onnx_file}...")
+model = SentenceTransformer(
+    'sentence-transformers/all-MiniLM-L6-v2',
+    backend="onnx",
+    model_kwargs={"file_name": onnx_file}
+)
 print(f"Model downloaded successfully. Embedding dimension: {model.get_sentence_embedding_dimension()}")
@@ -11,11 +11,15 @@ Endpoints:
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 from typing import Optional
-import requests
+import httpx
+import json
 import os
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +27,7 @@ logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
+    default_response_class=ORJSONResponse,
     title="LLM Service",
     description="LLM text generation proxy to Ollama",
     version="1.0.0"
@@ -40,12 +45,31 @@ app.add_middleware(
 # Configuration from environment variables
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+# Longer contexts would be truncated by Ollama anyway (it drops the start of the prompt)
+MAX_CONTEXT_CHARS = int(os.getenv("LLM_MAX_CONTEXT_CHARS", "12000"))
+# Ollama's model list rarely changes; /health reuses it for this many seconds
+OLLAMA_TAGS_TTL_SECONDS = float(os.getenv("OLLAMA_TAGS_TTL_SECONDS", "30"))
+ollama_tags_cache = {"model_names": None, "fetched_at": 0.0}
 
 logger.info(f"LLM Service initialized")
 logger.info(f"Ollama URL: {OLLAMA_BASE_URL}")
 logger.info(f"Default model: {DEFAULT_MODEL}")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Create the shared Ollama HTTP client (connection pool reused across requests)"""
+    app.state.http = httpx.AsyncClient(
+        timeout=httpx.Timeout(120.0, connect=5.0),  # 2 minute timeout for LLM generation
+        limits=httpx.Limits(max_connections=64)
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await app.state.http.aclose()
+
+
 # Language instructions for LLM prompts
 LANGUAGE_INSTRUCTIONS = {
     "en": "Please provide a clear, concise answer in English.",
@@ -63,6 +87,23 @@ LANGUAGE_INSTRUCTIONS = {
     "ja": "日本語で明確かつ簡潔な回答を提供してください。 (Please provide a clear, concise answer in Japanese.)",
     "ko": "한국어로 명확하고 간결한 답변을 제공해주세요. (Please provide a clear, concise answer in Korean.)"
 }
+DEFAULT_LANGUAGE_INSTRUCTION = LANGUAGE_INSTRUCTIONS["en"]
+
+PROMPT_TEMPLATE = """You are a helpful AI assistant answering questions about a meeting transcript.
+
+Context from the meeting:
+{context}
+
+User question: {prompt}
+
+{language_instruction}
+- If the user asks for a summary or what was discussed, summarize the key points from the context.
+- If the context is partial, answer with what is available and mention it is based on partial transcript.
+- Only say "I don't have enough information" (in the target language) when the context is empty or unrelated to the question.
+- Base your answer ONLY on the context provided above.
+- Respond entirely in the requested language.
+
+Answer:"""
 
 
 # Request/Response models
@@ -72,6 +113,7 @@ class GenerateRequest(BaseModel):
     max_tokens: Optional[int] = 500
     temperature: Optional[float] = 0.7
     language: Optional[str] = "en"
+    stream: bool = False  # True: text/event-stream of {"response": chunk} events
 
     class Config:
         json_schema_extra = {
@@ -90,6 +132,23 @@ class GenerateResponse(BaseModel):
     model: str
 
 
+async def _stream_ollama(response: httpx.Response):
+    """Relay Ollama's NDJSON stream as server-sent events"""
+    total_chars = 0
+    async for line in response.aiter_lines():
+        if not line:
+            continue
+        chunk = json.loads(line)
+        text = chunk.get("response", "")
+        if text:
+            total_chars += len(text)
+            yield f"data: {json.dumps({'response': text}, ensure_ascii=False)}\n\n"
+        if chunk.get("done"):
+            break
+    logger.info(f"Streamed response (length: {total_chars} chars)")
+    yield f"data: {json.dumps({'done': True, 'model': DEFAULT_MODEL})}\n\n"
+
+
 # Endpoints
 @app.post("/generate", response_model=GenerateResponse)
 async def generate(request: GenerateRequest):
@@ -103,7 +162,8 @@ async def generate(request: GenerateRequest):
         request: GenerateRequest with prompt, context, and generation parameters
 
     Returns:
-        GenerateResponse with generated answer and model name
+        GenerateResponse with generated answer and model name, or a
+        text/event-stream of partial responses when request.stream is set
     """
     try:
         if not request.prompt or not request.prompt.strip():
@@ -114,24 +174,16 @@ async def generate(request: GenerateRequest):
         logger.info(f"Response language: {request.language}")
 
         # Build full prompt with system instructions and context
-        language = request.language or "en"
-        language_instruction = LANGUAGE_INSTRUCTIONS.get(language, LANGUAGE_INSTRUCTIONS["en"])
-
-        full_prompt = f"""You are a helpful AI assistant answering questions about a meeting transcript.
-
-Context from the meeting:
-{request.context}
-
-User question: {request.prompt}
-
-{language_instruction}
-- If the user asks for a summary or what was discussed, summarize the key points from the context.
-- If the context is partial, answer with what is available and mention it is based on partial transcript.
-- Only say "I don't have enough information" (in the target language) when the context is empty or unrelated to the question.
-- Base your answer ONLY on the context provided above.
-- Respond entirely in the requested language.
-
-Answer:"""
+        language_instruction = LANGUAGE_INSTRUCTIONS.get(request.language, DEFAULT_LANGUAGE_INSTRUCTION)
+        context = request.context
+        if len(context) > MAX_CONTEXT_CHARS:
+            context = context[:MAX_CONTEXT_CHARS] + "\n[Context truncated]"
+
+        full_prompt = PROMPT_TEMPLATE.format(
+            context=context,
+            prompt=request.prompt,
+            language_instruction=language_instruction
+        )
 
         # Call Ollama API
         ollama_url = f"{OLLAMA_BASE_URL}/api/generate"
@@ -139,7 +191,7 @@ Answer:"""
         payload = {
             "model": DEFAULT_MODEL,
             "prompt": full_prompt,
-            "stream": False,
+            "stream": request.stream,
             "options": {
                 "temperature": request.temperature,
                 "num_predict": request.max_tokens
@@ -148,11 +200,22 @@ Answer:"""
 
         logger.info(f"Calling Ollama at {ollama_url}")
 
-        response = requests.post(
-            ollama_url,
-            json=payload,
-            timeout=120  # 2 minute timeout for LLM generation
-        )
+        if request.stream:
+            # Open the stream here so connection/HTTP errors still map to status codes below
+            response = await app.state.http.send(
+                app.state.http.build_request("POST", ollama_url, json=payload),
+                stream=True
+            )
+            if response.is_error:
+                await response.aclose()
+            response.raise_for_status()
+            return StreamingResponse(
+                _stream_ollama(response),
+                media_type="text/event-stream",
+                background=BackgroundTask(response.aclose)
+            )
+
+        response = await app.state.http.post(ollama_url, json=payload)
 
         response.raise_for_status()
         result = response.json()
@@ -172,19 +235,19 @@ Answer:"""
             model=DEFAULT_MODEL
         )
 
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         logger.error("Cannot connect to Ollama service")
         raise HTTPException(
             status_code=503,
             detail=f"Cannot connect to Ollama at {OLLAMA_BASE_URL}. Is Ollama running?"
         )
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error("Ollama request timed out")
         raise HTTPException(
             status_code=504,
             detail="LLM generation timed out (exceeded 120 seconds)"
         )
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         logger.error(f"Ollama HTTP error: {str(e)}")
         raise HTTPException(
             status_code=502,
@@ -209,12 +272,16 @@ async def health_check():
         Health status with Ollama connectivity information
     """
     try:
-        # Try to ping Ollama
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
-        response.raise_for_status()
+        model_names = ollama_tags_cache["model_names"]
+        if model_names is None or time.monotonic() - ollama_tags_cache["fetched_at"] > OLLAMA_TAGS_TTL_SECONDS:
+            # Try to ping Ollama (keep-alive connection from the shared client)
+            response = await app.state.http.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5.0)
+            response.raise_for_status()
 
-        models = response.json().get("models", [])
-        model_names = [m.get("name") for m in models]
+            models = response.json().get("models", [])
+            model_names = [m.get("name") for m in models]
+            ollama_tags_cache["model_names"] = model_names
+            ollama_tags_cache["fetched_at"] = time.monotonic()
 
         # Check if our default model is available
         model_available = any(DEFAULT_MODEL in name for name in model_names)
@@ -244,5 +311,7 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8007,
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -1,9 +1,14 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from deep_translator import GoogleTranslator
+import asyncio
+import os
+import re
+from typing import Optional
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -14,6 +19,157 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Local NLLB-200 (CTranslate2 int8) for known language pairs; Google Translate otherwise
+NLLB_MODEL_DIR = os.getenv("NLLB_MODEL_DIR", "/app/models/nllb-200-distilled-600M-ct2")
+NLLB_BEAM_SIZE = int(os.getenv("NLLB_BEAM_SIZE", "2"))
+NLLB_MAX_BATCH = int(os.getenv("NLLB_MAX_BATCH", "16"))
+# Concurrent /translate requests are coalesced for up to NLLB_BATCH_WAIT_MS or NLLB_MAX_BATCH requests
+NLLB_BATCH_WAIT = float(os.getenv("NLLB_BATCH_WAIT_MS", "10")) / 1000.0
+
+# App language codes -> NLLB (FLORES-200) codes
+NLLB_LANGS = {
+    "en": "eng_Latn",
+    "ar": "arb_Arab",
+    "ur": "urd_Arab",
+    "hi": "hin_Deva",
+    "ml": "mal_Mlym",
+    "te": "tel_Telu",
+    "ta": "tam_Taml",
+    "bn": "ben_Beng",
+    "es": "spa_Latn",
+    "fr": "fra_Latn",
+    "de": "deu_Latn",
+    "zh": "zho_Hans",
+    "ja": "jpn_Jpan",
+    "ko": "kor_Hang",
+}
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|(?<=[。！？])")
+
+nllb_translator = None
+nllb_tokenizer = None
+try:
+    import ctranslate2
+    from transformers import AutoTokenizer
+
+    if os.path.isdir(NLLB_MODEL_DIR):
+        nllb_device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        nllb_translator = ctranslate2.Translator(
+            NLLB_MODEL_DIR,
+            device=nllb_device,
+            compute_type="int8_float16" if nllb_device == "cuda" else "int8",
+            inter_threads=2
+        )
+        nllb_tokenizer = AutoTokenizer.from_pretrained(NLLB_MODEL_DIR)
+        print(f"✓ NLLB model loaded from {NLLB_MODEL_DIR} on {nllb_device}")
+    else:
+        print(f"⚠️ NLLB model not found at {NLLB_MODEL_DIR}, using Google Translate only")
+except Exception as e:
+    print(f"⚠️ NLLB model unavailable ({e}), using Google Translate only")
+    nllb_translator = None
+
+def nllb_encode(text: str, source_code: str) -> list:
+    """Split text into sentences and tokenize each as an NLLB source sequence"""
+    sentences = [s for s in SENTENCE_SPLIT_RE.split(text.strip()) if s]
+    # NLLB input format: [src_lang] tokens </s>; built by hand so the shared tokenizer
+    # is never mutated (src_lang) across concurrent requests
+    return [
+        [source_code] + nllb_tokenizer.tokenize(sentence) + [nllb_tokenizer.eos_token]
+        for sentence in sentences
+    ]
+
+def nllb_translate_batch(sources: list, target_codes: list) -> list:
+    """Translate token sequences (each with its own target language) in one CTranslate2 call"""
+    results = nllb_translator.translate_batch(
+        sources,
+        target_prefix=[[code] for code in target_codes],
+        beam_size=NLLB_BEAM_SIZE,
+        max_batch_size=NLLB_MAX_BATCH
+    )
+    return [
+        nllb_tokenizer.decode(
+            nllb_tokenizer.convert_tokens_to_ids(result.hypotheses[0][1:]),
+            skip_special_tokens=True
+        )
+        for result in results
+    ]
+
+nllb_queue: Optional[asyncio.Queue] = None
+nllb_batch_task: Optional[asyncio.Task] = None
+
+async def _nllb_batch_worker(queue: asyncio.Queue):
+    """Collect queued requests for up to NLLB_BATCH_WAIT seconds and translate their sentences together"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + NLLB_BATCH_WAIT
+        while len(batch) < NLLB_MAX_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # Flatten every request's sentences into one batch, then split the results back
+        sources = []
+        target_codes = []
+        for tokens, target_code, _ in batch:
+            sources.extend(tokens)
+            target_codes.extend([target_code] * len(tokens))
+        try:
+            translations = await asyncio.to_thread(nllb_translate_batch, sources, target_codes)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        offset = 0
+        for tokens, _, future in batch:
+            if not future.done():
+                future.set_result(" ".join(translations[offset:offset + len(tokens)]))
+            offset += len(tokens)
+
+async def translate_nllb(text: str, source_code: str, target_code: str) -> str:
+    """Queue text for the shared NLLB batch worker and wait for its translation"""
+    global nllb_queue, nllb_batch_task
+    tokens = nllb_encode(text, source_code)
+    if not tokens:
+        return ""
+    if nllb_queue is None:
+        nllb_queue = asyncio.Queue()
+        nllb_batch_task = asyncio.create_task(_nllb_batch_worker(nllb_queue))
+    future = asyncio.get_running_loop().create_future()
+    await nllb_queue.put((tokens, target_code, future))
+    return await future
+
+def translate_google(text: str, source_lang: str, target_lang: str) -> str:
+    # Map language codes
+    # deep_translator uses full language names for some languages
+    lang_map = {
+        "ar": "arabic",
+        "ur": "urdu",
+        "en": "english",
+        "auto": "auto"
+    }
+
+    source = lang_map.get(source_lang, source_lang)
+    target = lang_map.get(target_lang, target_lang)
+
+    translator = GoogleTranslator(source=source, target=target)
+    return translator.translate(text)
+
+async def translate_text(text: str, source_lang: str, target_lang: str) -> str:
+    source_code = NLLB_LANGS.get(source_lang)
+    target_code = NLLB_LANGS.get(target_lang)
+    if nllb_translator is not None and source_code and target_code:
+        try:
+            return await translate_nllb(text, source_code, target_code)
+        except Exception as e:
+            print(f"NLLB translation failed ({e}), falling back to Google Translate")
+    return await asyncio.to_thread(translate_google, text, source_lang, target_lang)
+
 class TranslateRequest(BaseModel):
     text: str
     source_lang: str = "en"
@@ -25,32 +181,19 @@ async def translate(req: TranslateRequest):
     try:
         if not req.text or not req.text.strip():
             return {"translation": ""}
-        
-        # Map language codes
-        # deep_translator uses full language names for some languages
-        lang_map = {
-            "ar": "arabic",
-            "ur": "urdu",
-            "en": "english",
-            "auto": "auto"
-        }
-        
-        source = lang_map.get(req.source_lang, req.source_lang)
-        target = lang_map.get(req.target_lang, req.target_lang)
-        
-        translator = GoogleTranslator(source=source, target=target)
-        translation = translator.translate(req.text)
-        
+
+        translation = await translate_text(req.text, req.source_lang, req.target_lang)
+
         return {"translation": translation}
-    
+
     except Exception as e:
         print(f"Translation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "nllb_loaded": nllb_translator is not None}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8004)
+    uvicorn.run(app, host="127.0.0.1", port=8004, loop="uvloop", http="httptools")
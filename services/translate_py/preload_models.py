@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""Convert the NLLB translation model to CTranslate2 (int8) during Docker build"""
+
+import os
+import ctranslate2
+from ctranslate2.converters import TransformersConverter
+from transformers import AutoTokenizer
+
+NLLB_MODEL = os.getenv("NLLB_MODEL", "facebook/nllb-200-distilled-600M")
+NLLB_MODEL_DIR = os.getenv("NLLB_MODEL_DIR", "/models/nllb-200-distilled-600M-ct2")
+
+print(f"Converting {NLLB_MODEL} to CTranslate2 (int8) at {NLLB_MODEL_DIR}...")
+TransformersConverter(NLLB_MODEL).convert(NLLB_MODEL_DIR, quantization="int8", force=True)
+
+# Keep the tokenizer next to the converted weights so runtime needs no HF download
+AutoTokenizer.from_pretrained(NLLB_MODEL).save_pretrained(NLLB_MODEL_DIR)
+
+translator = ctranslate2.Translator(NLLB_MODEL_DIR, device="cpu", compute_type="int8")
+print("✓ NLLB model converted successfully")
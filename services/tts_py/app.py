@@ -5,21 +5,37 @@ Provides high-quality voice cloning from reference audio.
 """
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 from TTS.api import TTS
 from gtts import gTTS
-import tempfile
+import io
 import os
 import logging
 import asyncio
-from threading import Thread
+from threading import Lock
 import re
-from pydub import AudioSegment
+import contextlib
+import hashlib
+import functools
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import numpy as np
+import soundfile as sf
+import torch
+import torchaudio
+
+from text_chunking import chunk_text
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# XTTS falls back to CPU without a GPU; cap its thread pool (TORCH_THREADS)
+torch.set_num_threads(int(os.getenv("TORCH_THREADS", "4")))
+torch.set_num_interop_threads(1)
+
 app = FastAPI(title="TTS Service with XTTS v2")
 
 # Add CORS middleware
@@ -34,66 +50,377 @@ app.add_middleware(
 # Global TTS model
 tts_model = None
 model_loading = True
+# Set once XTTS has loaded (or failed to) and the warmup synthesis has run
+model_ready = asyncio.Event()
+model_load_task: "asyncio.Task | None" = None
+
+# XTTS inference precision on CUDA: fp16 / bf16 (autocast) or fp32
+TTS_PRECISION = os.getenv("TTS_PRECISION", "fp16").lower()
+xtts_amp_dtype = None
+
+# LRU of synthesized /synthesize audio, mirrored to disk so it survives restarts
+XTTS_SPEAKER = "Claribel Dervla"
+# (gpt_cond_latent, speaker_embedding) of XTTS_SPEAKER, resolved once at model load
+default_latents = None
+TTS_CACHE_SIZE = int(os.getenv("TTS_CACHE_SIZE", "256"))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "/tmp/tts_cache")
+tts_cache: "OrderedDict[str, bytes]" = OrderedDict()
+tts_cache_lock = Lock()
+
+# (gpt_cond_latent, speaker_embedding) of recent voice-cloning references, on the model's device
+XTTS_SAMPLE_RATE = 22050
+REFERENCE_CACHE_SIZE = int(os.getenv("TTS_REFERENCE_CACHE_SIZE", "32"))
+reference_latents: "OrderedDict[str, tuple]" = OrderedDict()
+reference_latents_lock = Lock()
+# Latents are also saved here as <speaker_id>.pt so clients can reuse a voice by id
+# (speaker_id form field) and known voices survive restarts
+TTS_VOICE_DIR = os.getenv("TTS_VOICE_DIR", "/app/voices")
+# Saved voices kept on disk; the least recently used beyond this are deleted
+TTS_VOICE_DIR_MAX_FILES = int(os.getenv("TTS_VOICE_DIR_MAX_FILES", "1000"))
+SPEAKER_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+# Blocking synthesis (XTTS, gTTS, WAV encoding) runs here so the event loop keeps serving;
+# TTS_NUM_WORKERS bounds concurrent XTTS calls on the single model replica
+executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+TTS_NUM_WORKERS = int(os.getenv("TTS_NUM_WORKERS", "1"))
+model_slots = asyncio.Semaphore(TTS_NUM_WORKERS)
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the executor"""
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(func, *args, **kwargs)
+    )
+
+async def run_model(func, *args, **kwargs):
+    """Run a blocking XTTS call on the executor while holding a model slot"""
+    async with model_slots:
+        return await run_blocking(func, *args, **kwargs)
 
 def load_xtts_model():
-    """Load XTTS v2 model in background thread"""
-    global tts_model, model_loading
+    """Load XTTS v2 model (blocking; run off the event loop by load_and_warmup_xtts)"""
+    global tts_model, xtts_amp_dtype, default_latents
     try:
         logger.info("Loading XTTS v2 model in background... This may take a few minutes...")
         import torch
         gpu_available = torch.cuda.is_available()
         logger.info(f"GPU available: {gpu_available}")
+        if gpu_available:
+            # TF32 tensor cores for the GPT decoder and HiFi-GAN on Ampere+
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
 
         # Load model with GPU if available
-        tts_model = TTS("tts_models/multilingual/multi-dataset/xtts_v2", gpu=gpu_available)
+        model = TTS("tts_models/multilingual/multi-dataset/xtts_v2", gpu=gpu_available)
+        model.synthesizer.tts_model.eval()
+        speaker = model.synthesizer.tts_model.speaker_manager.speakers[XTTS_SPEAKER]
+        default_latents = (speaker["gpt_cond_latent"], speaker["speaker_embedding"])
+        tts_model = model
+        load_saved_voices()
 
         if gpu_available:
-            logger.info(f"✓ XTTS v2 model loaded on GPU: {torch.cuda.get_device_name(0)}")
+            if TTS_PRECISION == "bf16" and torch.cuda.is_bf16_supported():
+                xtts_amp_dtype = torch.bfloat16
+            elif TTS_PRECISION in ("fp16", "bf16"):
+                xtts_amp_dtype = torch.float16
+            logger.info(f"✓ XTTS v2 model loaded on GPU: {torch.cuda.get_device_name(0)} ({xtts_amp_dtype or 'fp32'})")
         else:
             logger.info("✓ XTTS v2 model loaded on CPU")
     except Exception as e:
         logger.warning(f"XTTS v2 not available: {e}")
         logger.info("Service will continue using gTTS fallback")
+
+async def load_and_warmup_xtts():
+    """Load XTTS, then run one throwaway synthesis so CUDA kernels and allocator
+    pools are initialized before the first real request"""
+    global model_loading
+    try:
+        await asyncio.to_thread(load_xtts_model)
+        if tts_model is not None:
+            try:
+                await run_model(xtts_clone, "Warmup.", "en", default_latents)
+                logger.info("✓ XTTS v2 warmup complete")
+            except Exception as e:
+                logger.warning(f"XTTS v2 warmup failed: {e}")
     finally:
         model_loading = False
+        model_ready.set()
+
+GTTS_SAMPLE_RATE = 16000
+
+def encode_wav(audio: np.ndarray, sample_rate: int) -> bytes:
+    """Encode float samples as 16-bit PCM WAV bytes in memory"""
+    buf = io.BytesIO()
+    sf.write(buf, audio, sample_rate, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
+
+@contextlib.contextmanager
+def xtts_inference_context():
+    """inference_mode plus fp16/bf16 autocast for XTTS on CUDA; weights stay fp32 so
+    mixed-dtype conditioning inputs still work"""
+    autocast = (
+        torch.autocast("cuda", dtype=xtts_amp_dtype)
+        if xtts_amp_dtype is not None else contextlib.nullcontext()
+    )
+    # Grad mode is thread-local, so it is set here (on the executor thread) rather than globally
+    with torch.inference_mode(), autocast:
+        yield
+
+def reference_key(reference) -> str:
+    """Content hash of a reference clip file object, read in 1 MB blocks (also its speaker id)"""
+    digest = hashlib.blake2b(digest_size=16)
+    reference.seek(0)
+    for block in iter(lambda: reference.read(1 << 20), b""):
+        digest.update(block)
+    return digest.hexdigest()
+
+def remember_latents(key: str, latents: tuple):
+    with reference_latents_lock:
+        reference_latents[key] = latents
+        reference_latents.move_to_end(key)
+        while len(reference_latents) > REFERENCE_CACHE_SIZE:
+            reference_latents.popitem(last=False)
+
+def cached_latents(key: str):
+    """Latents for a speaker id from the in-memory LRU, else from TTS_VOICE_DIR; None if unknown"""
+    with reference_latents_lock:
+        latents = reference_latents.get(key)
+        if latents is not None:
+            reference_latents.move_to_end(key)
+            return latents
+
+    if not TTS_VOICE_DIR:
+        return None
+    path = os.path.join(TTS_VOICE_DIR, f"{key}.pt")
+    if not os.path.isfile(path):
+        return None
+    try:
+        saved = torch.load(path, map_location=tts_model.synthesizer.tts_model.device, weights_only=True)
+    except Exception as e:
+        logger.warning(f"Failed to load saved voice {key}: {e}")
+        return None
+    latents = (saved["gpt_cond_latent"], saved["speaker_embedding"])
+    remember_latents(key, latents)
+    try:
+        # Mark as recently used for evict_saved_voices
+        os.utime(path)
+    except OSError:
+        pass
+    return latents
+
+def save_latents(key: str, latents: tuple):
+    if not TTS_VOICE_DIR:
+        return
+    gpt_cond_latent, speaker_embedding = latents
+    try:
+        os.makedirs(TTS_VOICE_DIR, exist_ok=True)
+        torch.save(
+            {"gpt_cond_latent": gpt_cond_latent.cpu(), "speaker_embedding": speaker_embedding.cpu()},
+            os.path.join(TTS_VOICE_DIR, f"{key}.pt")
+        )
+    except Exception as e:
+        logger.warning(f"Failed to save voice {key}: {e}")
+        return
+    evict_saved_voices()
+
+def evict_saved_voices():
+    """Delete the oldest saved voices beyond TTS_VOICE_DIR_MAX_FILES"""
+    try:
+        entries = [
+            entry for entry in os.scandir(TTS_VOICE_DIR)
+            if entry.is_file() and entry.name.endswith(".pt")
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+    except OSError as e:
+        logger.warning(f"Failed to list saved voices in {TTS_VOICE_DIR}: {e}")
+        return
+    for entry in entries[:max(0, len(entries) - TTS_VOICE_DIR_MAX_FILES)]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
+
+def load_saved_voices():
+    """Warm the latents LRU with the most recently saved voices (called once the model is on its device)"""
+    if not TTS_VOICE_DIR or not os.path.isdir(TTS_VOICE_DIR):
+        return
+    try:
+        entries = [
+            entry for entry in os.scandir(TTS_VOICE_DIR)
+            if entry.is_file() and entry.name.endswith(".pt")
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+    except OSError as e:
+        logger.warning(f"Failed to list saved voices in {TTS_VOICE_DIR}: {e}")
+        return
+    for entry in entries[-REFERENCE_CACHE_SIZE:]:
+        cached_latents(entry.name[:-3])
+    logger.info(f"Loaded {len(reference_latents)} saved voice(s) from {TTS_VOICE_DIR}")
+
+def reference_conditioning(reference, key: str) -> tuple:
+    """Return (gpt_cond_latent, speaker_embedding) for a reference clip file object.
+
+    The clip is decoded straight from the file (no full bytes copy) and resampled on
+    the model's device; known references (same speaker id) reuse the cached or saved
+    latents and skip the speaker encoder.
+    """
+    latents = cached_latents(key)
+    if latents is not None:
+        return latents
 
-def chunk_text(text, max_chars=250):
+    xtts = tts_model.synthesizer.tts_model
+    config = xtts.config
+    reference.seek(0)
+    audio, sr = sf.read(reference, dtype="float32", always_2d=True)
+    wav = torch.from_numpy(audio.mean(axis=1, dtype=np.float32)).unsqueeze(0).to(xtts.device)
+    wav = torchaudio.functional.resample(wav, sr, XTTS_SAMPLE_RATE).clamp_(-1.0, 1.0)
+    wav = wav[:, :XTTS_SAMPLE_RATE * getattr(config, "max_ref_len", 30)]
+    with xtts_inference_context():
+        speaker_embedding = xtts.get_speaker_embedding(wav, XTTS_SAMPLE_RATE)
+        gpt_cond_latent = xtts.get_gpt_cond_latents(
+            wav,
+            XTTS_SAMPLE_RATE,
+            length=getattr(config, "gpt_cond_len", 6),
+            chunk_length=getattr(config, "gpt_cond_chunk_len", 6)
+        )
+
+    latents = (gpt_cond_latent, speaker_embedding)
+    remember_latents(key, latents)
+    save_latents(key, latents)
+    return latents
+
+def xtts_clone(text: str, language: str, latents: tuple) -> np.ndarray:
+    """Synthesize one chunk straight through Xtts.inference with precomputed latents"""
+    xtts = tts_model.synthesizer.tts_model
+    config = xtts.config
+    gpt_cond_latent, speaker_embedding = latents
+    with xtts_inference_context():
+        out = xtts.inference(
+            text,
+            language,
+            gpt_cond_latent,
+            speaker_embedding,
+            temperature=config.temperature,
+            length_penalty=config.length_penalty,
+            repetition_penalty=config.repetition_penalty,
+            top_k=config.top_k,
+            top_p=config.top_p,
+            # Splits at the per-language character limit (stricter than chunk_text for CJK/Arabic)
+            enable_text_splitting=True
+        )
+    wav = out["wav"]
+    if isinstance(wav, torch.Tensor):
+        wav = wav.cpu().numpy()
+    return np.asarray(wav, dtype=np.float32)
+
+def xtts_to_wav(wav) -> bytes:
+    """Write XTTS output with the synthesizer's own WAV writer (peak-normalized PCM16) in memory"""
+    buf = io.BytesIO()
+    tts_model.synthesizer.save_wav(wav, buf)
+    return buf.getvalue()
+
+def xtts_synthesize(text: str, language: str, latents: tuple) -> bytes:
+    """Synthesize the whole text in one Xtts.inference call and return WAV bytes.
+
+    XTTS splits long text itself (enable_text_splitting), so only the streaming
+    path pre-chunks with chunk_text.
     """
-    Split text into chunks suitable for XTTS v2 voice cloning.
-    XTTS has a limit of ~400 tokens, so we keep chunks around 250 characters
-    to be safe and split on sentence boundaries.
+    return xtts_to_wav(xtts_clone(text, language, latents))
+
+def wav_stream_header(sample_rate: int) -> bytes:
+    """PCM16 mono WAV header with 0xFFFFFFFF sizes (length unknown while streaming)"""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", 0xFFFFFFFF
+    )
+
+async def stream_xtts(chunks: list, language: str, latents: tuple):
+    """Yield a WAV header, then each chunk's PCM16 as soon as it is synthesized.
+
+    Each chunk goes through run_model, so streaming shares the TTS_NUM_WORKERS
+    limit with the buffered endpoints. Each chunk is peak-normalized on its own,
+    like save_wav does.
     """
-    # Split on sentence boundaries
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    yield wav_stream_header(tts_model.synthesizer.output_sample_rate)
+    for i, chunk in enumerate(chunks):
+        logger.info(f"Streaming chunk {i+1}/{len(chunks)}: {chunk[:50]}...")
+        wav = await run_model(xtts_clone, chunk, language, latents)
+        peak = max(0.01, float(np.max(np.abs(wav)))) if wav.size else 1.0
+        yield (wav * (32767 / peak)).astype("<i2").tobytes()
 
-    chunks = []
-    current_chunk = ""
+def gtts_to_wav(text: str, language: str) -> bytes:
+    """Synthesize with gTTS and convert its MP3 to 16 kHz mono WAV in memory"""
+    mp3 = io.BytesIO()
+    gTTS(text=text, lang=language, slow=False).write_to_fp(mp3)
+    mp3.seek(0)
+    audio, sr = sf.read(mp3, dtype="float32", always_2d=True)
+    audio = torch.from_numpy(audio.mean(axis=1, dtype=np.float32))
+    if sr != GTTS_SAMPLE_RATE:
+        audio = torchaudio.functional.resample(audio, sr, GTTS_SAMPLE_RATE)
+    return encode_wav(audio.numpy(), GTTS_SAMPLE_RATE)
 
-    for sentence in sentences:
-        # If adding this sentence exceeds max_chars, save current chunk and start new one
-        if len(current_chunk) + len(sentence) > max_chars and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence
-        else:
-            current_chunk += (" " if current_chunk else "") + sentence
+def tts_cache_key(engine: str, language: str, text: str) -> str:
+    return hashlib.blake2b(f"{engine}|{language}|{text}".encode("utf-8"), digest_size=16).hexdigest()
 
-    # Add the last chunk if any
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+def tts_cache_get(key: str):
+    with tts_cache_lock:
+        audio_data = tts_cache.get(key)
+        if audio_data is not None:
+            tts_cache.move_to_end(key)
+    return audio_data
 
-    return chunks if chunks else [text]
+def tts_cache_put(key: str, audio_data: bytes):
+    """Insert into the LRU and mirror to TTS_CACHE_DIR (blocking file I/O; run off the event loop)"""
+    evicted = []
+    with tts_cache_lock:
+        tts_cache[key] = audio_data
+        tts_cache.move_to_end(key)
+        while len(tts_cache) > TTS_CACHE_SIZE:
+            evicted.append(tts_cache.popitem(last=False)[0])
+    if TTS_CACHE_DIR:
+        for evicted_key in evicted:
+            try:
+                os.unlink(os.path.join(TTS_CACHE_DIR, f"{evicted_key}.wav"))
+            except OSError:
+                pass
+        try:
+            with open(os.path.join(TTS_CACHE_DIR, f"{key}.wav"), "wb") as f:
+                f.write(audio_data)
+        except OSError as e:
+            logger.warning(f"Failed to write TTS cache entry: {e}")
+
+def load_tts_cache():
+    """Warm the in-memory cache with the most recently written entries on disk"""
+    if not TTS_CACHE_DIR or TTS_CACHE_SIZE <= 0:
+        return
+    try:
+        os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+        entries = [
+            entry for entry in os.scandir(TTS_CACHE_DIR)
+            if entry.is_file() and entry.name.endswith(".wav")
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[-TTS_CACHE_SIZE:]:
+            with open(entry.path, "rb") as f:
+                tts_cache[entry.name[:-4]] = f.read()
+    except OSError as e:
+        logger.warning(f"Failed to load TTS cache from {TTS_CACHE_DIR}: {e}")
+    logger.info(f"Loaded {len(tts_cache)} cached TTS clip(s) from {TTS_CACHE_DIR}")
 
 @app.on_event("startup")
 async def startup_event():
     """Start model loading in background"""
     logger.info("TTS Service starting - available immediately with gTTS")
     logger.info("XTTS v2 will load in background")
-    thread = Thread(target=load_xtts_model, daemon=True)
-    thread.start()
+    global model_load_task
+    load_tts_cache()
+    model_load_task = asyncio.create_task(load_and_warmup_xtts())
 
 class TTSRequest(BaseModel):
     text: str
     language: str = "en"
+    stream: bool = False  # Stream XTTS audio chunk by chunk (WAV with unknown length)
 
 @app.post("/synthesize")
 async def synthesize(req: TTSRequest):
@@ -109,51 +436,46 @@ async def synthesize(req: TTSRequest):
         
         logger.info(f"Synthesizing text in {req.language}: {req.text[:100]}...")
         
-        # Create temporary output file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as output_file:
-            output_path = output_file.name
-        
-        # Try XTTS v2 first, fallback to gTTS
-        use_gtts = tts_model is None
+        # Try XTTS v2 first, fallback to gTTS (also for languages XTTS does not support)
+        use_gtts = tts_model is None or req.language not in tts_model.synthesizer.tts_model.config.languages
+        xtts_failed = False
+
+        # Identical requests (greetings, boilerplate) skip synthesis entirely
+        cache_key = tts_cache_key("gtts" if use_gtts else "xtts", req.language, req.text)
+        cached = tts_cache_get(cache_key) if TTS_CACHE_SIZE > 0 else None
+        if cached is not None:
+            logger.info("Synthesis cache hit")
+            return Response(
+                content=cached,
+                media_type="audio/wav",
+                headers={"Content-Disposition": "inline"}
+            )
+
+        if req.stream and not use_gtts:
+            logger.info("Using XTTS v2 for synthesis (streaming)")
+            return StreamingResponse(
+                stream_xtts(chunk_text(req.text), req.language, default_latents),
+                media_type="audio/wav",
+                headers={"Content-Disposition": "inline"}
+            )
         
         if not use_gtts:
             try:
                 logger.info("Using XTTS v2 for synthesis")
-                tts_model.tts_to_file(
-                    text=req.text,
-                    file_path=output_path,
-                    language=req.language,
-                    speaker="Claribel Dervla"
-                )
+                audio_data = await run_model(xtts_synthesize, req.text, req.language, default_latents)
             except Exception as e:
                 logger.warning(f"XTTS v2 failed: {e}, falling back to gTTS")
                 use_gtts = True
+                xtts_failed = True
         
-        # Use gTTS fallback
+        # Use gTTS fallback (MP3 decoded and resampled in-process, no ffmpeg)
         if use_gtts:
             logger.info("Using gTTS for synthesis")
-            tts = gTTS(text=req.text, lang=req.language, slow=False)
-            # gTTS saves as MP3, but we'll convert it
-            mp3_path = output_path.replace('.wav', '.mp3')
-            tts.save(mp3_path)
-            
-            # Convert MP3 to WAV using ffmpeg if available, otherwise return MP3
-            try:
-                import subprocess
-                subprocess.run(['ffmpeg', '-i', mp3_path, '-ar', '16000', '-ac', '1', output_path], 
-                             capture_output=True, check=True)
-                os.unlink(mp3_path)
-            except:
-                # If ffmpeg not available, just rename MP3 to use
-                os.rename(mp3_path, output_path)
-        
-        # Read generated audio
-        with open(output_path, "rb") as f:
-            audio_data = f.read()
-        
-        # Cleanup
-        os.unlink(output_path)
+            audio_data = await run_blocking(gtts_to_wav, req.text, req.language)
         
+        # A fallback after an XTTS error is not cached, so the next request retries XTTS
+        if TTS_CACHE_SIZE > 0 and not xtts_failed:
+            await asyncio.to_thread(tts_cache_put, cache_key, audio_data)
         logger.info("Synthesis complete")
         
         return Response(
@@ -170,13 +492,18 @@ async def synthesize(req: TTSRequest):
 async def synthesize_with_voice(
     text: str = Form(...),
     language: str = Form("en"),
-    reference_audio: UploadFile = File(...)
+    reference_audio: Optional[UploadFile] = File(None),
+    speaker_id: Optional[str] = Form(None),
+    stream: bool = Form(False)
 ):
     """
     Convert text to speech with voice cloning from reference audio.
     Uses Coqui XTTS v2 to clone the speaker's voice characteristics.
     
-    Returns WAV audio data.
+    Instead of re-uploading reference_audio, clients may pass the speaker_id
+    returned in the X-Speaker-Id header of an earlier response.
+
+    Returns WAV audio data; with stream=true, chunks are sent as they are synthesized.
     """
     try:
         if not text or not text.strip():
@@ -195,74 +522,45 @@ async def synthesize_with_voice(
                 )
         
         logger.info(f"Voice cloning synthesis in {language}: {text[:100]}...")
-        logger.info(f"Reference audio: {reference_audio.filename}")
-
-        # Save reference audio to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as ref_file:
-            ref_file.write(await reference_audio.read())
-            ref_audio_path = ref_file.name
-
-        # Split text into chunks to avoid token limit
-        chunks = chunk_text(text)
-        logger.info(f"Split text into {len(chunks)} chunk(s) for processing")
-
-        # Generate audio for each chunk
-        audio_segments = []
-        temp_files = []
 
-        try:
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Processing chunk {i+1}/{len(chunks)}: {chunk[:50]}...")
-
-                # Create temporary output file for this chunk
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as chunk_file:
-                    chunk_path = chunk_file.name
-                    temp_files.append(chunk_path)
-
-                # Generate speech with voice cloning for this chunk
-                tts_model.tts_to_file(
-                    text=chunk,
-                    file_path=chunk_path,
-                    speaker_wav=ref_audio_path,
-                    language=language
-                )
-
-                # Load audio segment
-                audio_segments.append(AudioSegment.from_wav(chunk_path))
-
-            # Combine all audio segments
-            logger.info(f"Combining {len(audio_segments)} audio segments...")
-            combined_audio = audio_segments[0]
-            for segment in audio_segments[1:]:
-                combined_audio += segment
-
-            # Export combined audio to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as output_file:
-                output_path = output_file.name
-
-            combined_audio.export(output_path, format="wav")
+        if reference_audio is not None:
+            logger.info(f"Reference audio: {reference_audio.filename}")
+            # Conditioning latents for this reference (cached by content hash); read from
+            # the spooled upload on the executor rather than copying it into bytes
+            speaker_id = await run_blocking(reference_key, reference_audio.file)
+            latents = await run_model(reference_conditioning, reference_audio.file, speaker_id)
+        elif speaker_id and SPEAKER_ID_RE.fullmatch(speaker_id):
+            logger.info(f"Saved voice: {speaker_id}")
+            latents = await run_blocking(cached_latents, speaker_id)
+            if latents is None:
+                raise HTTPException(status_code=404, detail=f"Unknown speaker_id: {speaker_id}")
+        else:
+            raise HTTPException(status_code=400, detail="reference_audio or a valid speaker_id is required")
+        headers = {"Content-Disposition": "inline", "X-Speaker-Id": speaker_id}
 
-            # Read generated audio
-            with open(output_path, "rb") as f:
-                audio_data = f.read()
+        if stream:
+            # Split text into chunks so audio can be sent as each one finishes
+            chunks = chunk_text(text)
+            logger.info(f"Split text into {len(chunks)} chunk(s) for streaming")
+            return StreamingResponse(
+                stream_xtts(chunks, language, latents),
+                media_type="audio/wav",
+                headers=headers
+            )
 
-            logger.info(f"Voice cloning complete: {len(audio_data)} bytes")
+        # One inference call; XTTS splits sentences at its per-language limit internally
+        audio_data = await run_model(xtts_synthesize, text, language, latents)
 
-        finally:
-            # Cleanup all temporary files
-            os.unlink(ref_audio_path)
-            if 'output_path' in locals():
-                os.unlink(output_path)
-            for temp_file in temp_files:
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
+        logger.info(f"Voice cloning complete: {len(audio_data)} bytes")
         
         return Response(
             content=audio_data,
             media_type="audio/wav",
-            headers={"Content-Disposition": "inline"}
+            headers=headers
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Voice cloning error: {e}")
         raise HTTPException(status_code=500, detail=f"Voice cloning failed: {str(e)}")
@@ -270,7 +568,7 @@ async def synthesize_with_voice(
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    status = "loading" if model_loading else "ready"
+    status = "ready" if model_ready.is_set() else "loading"
     return {
         "status": status,
         "service": "tts",
@@ -281,4 +579,4 @@ async def health():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8005)
+    uvicorn.run(app, host="127.0.0.1", port=8005, loop="uvloop", http="httptools")
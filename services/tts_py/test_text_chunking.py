@@ -0,0 +1,35 @@
+"""Tests for chunk_text (run with: python -m unittest test_text_chunking)"""
+import unittest
+
+from text_chunking import chunk_text
+
+
+class ChunkTextTest(unittest.TestCase):
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(chunk_text("Hello there. How are you?"), ["Hello there. How are you?"])
+
+    def test_splits_on_sentence_boundaries(self):
+        self.assertEqual(
+            chunk_text("First one. Second one! Third one?", max_chars=22),
+            ["First one. Second one!", "Third one?"]
+        )
+
+    def test_multiple_spaces_and_newlines_collapse_to_one_space(self):
+        text = "First one.   Second one!\n\nThird one?\n"
+        self.assertEqual(chunk_text(text), ["First one. Second one! Third one?"])
+        # Separators count as one character, so boundaries match single-spaced text
+        self.assertEqual(
+            chunk_text(text, max_chars=22),
+            chunk_text("First one. Second one! Third one?", max_chars=22)
+        )
+
+    def test_long_sentence_stays_whole(self):
+        sentence = "word " * 80 + "end."
+        self.assertEqual(chunk_text(f"Hi. {sentence} Bye.", max_chars=50), ["Hi.", sentence, "Bye."])
+
+    def test_empty_text(self):
+        self.assertEqual(chunk_text(""), [""])
+
+
+if __name__ == "__main__":
+    unittest.main()
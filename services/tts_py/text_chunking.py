@@ -0,0 +1,47 @@
+"""
+Sentence-boundary text chunking for XTTS v2 (stdlib only, so it can be tested
+without loading the TTS stack).
+"""
+import re
+
+# Sentence terminator plus the whitespace after it (what chunk_text splits on)
+SENTENCE_END_RE = re.compile(r'[.!?]\s+')
+
+def chunk_text(text, max_chars=250):
+    """
+    Split text into chunks suitable for XTTS v2 voice cloning.
+    XTTS has a limit of ~400 tokens, so we keep chunks around 250 characters
+    to be safe and split on sentence boundaries.
+
+    Sentences within a chunk are joined by a single space, whatever whitespace
+    separated them in the input, and chunk length is counted the same way.
+    """
+    chunks = []
+    # Sentences are located by index and each chunk is joined once, so long inputs
+    # never rebuild the current chunk string sentence by sentence
+    current = []
+    current_len = 0
+    sentence_start = 0
+    boundaries = [(m.start() + 1, m.end()) for m in SENTENCE_END_RE.finditer(text)]
+    boundaries.append((len(text), len(text)))
+
+    for sentence_end, next_start in boundaries:
+        sentence = text[sentence_start:sentence_end]
+        sentence_start = next_start
+        # If adding this sentence exceeds max_chars, save current chunk and start new one
+        if current_len and current_len + len(sentence) > max_chars:
+            chunks.append(" ".join(current).strip())
+            current = [sentence]
+            current_len = len(sentence)
+        elif current_len:
+            current.append(sentence)
+            current_len += 1 + len(sentence)
+        else:
+            current = [sentence]
+            current_len = len(sentence)
+
+    # Add the last chunk if any
+    if current_len:
+        chunks.append(" ".join(current).strip())
+
+    return chunks if chunks else [text]